@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import DashboardSettings, Notification, SavedReport
+from .models import DashboardSettings, Notification, SavedReport, ReportJob
 
 @admin.register(DashboardSettings)
 class DashboardSettingsAdmin(admin.ModelAdmin):
@@ -17,4 +17,11 @@ class NotificationAdmin(admin.ModelAdmin):
 class SavedReportAdmin(admin.ModelAdmin):
     list_display = ('name', 'user', 'report_type', 'created_at', 'last_run')
     list_filter = ('report_type', 'created_at')
-    search_fields = ('name', 'user__username')
\ No newline at end of file
+    search_fields = ('name', 'user__username')
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'report_type', 'status', 'created_at', 'finished_at')
+    list_filter = ('status', 'report_type')
+    search_fields = ('user__username',)
+    readonly_fields = ('result', 'error', 'started_at', 'finished_at')
\ No newline at end of file
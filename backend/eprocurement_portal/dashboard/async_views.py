@@ -0,0 +1,38 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+from .caching import get_dashboard_settings
+from .models import NotificationCounter
+from .snapshots import aget_dashboard_snapshot, enabled_sections
+from .streaming import authenticate_request
+
+
+async def dashboard_summary(request):
+    """Async variant of the dashboard summary.
+
+    Returns the same payload as ``DashboardSummaryView``, but builds the
+    enabled sections concurrently, each under its own timeout. Serve it
+    through ``asgi.py``; under WSGI it still works but gains nothing.
+    """
+    user = await sync_to_async(authenticate_request)(request)
+    if user is None:
+        return JsonResponse(
+            {'detail': 'Authentication credentials were not provided.'}, status=401
+        )
+
+    settings = await sync_to_async(get_dashboard_settings)(user.id)
+
+    # Default date range is 30 days if not specified
+    days = request.GET.get('days', settings['default_date_range'])
+    try:
+        days = int(days)
+    except ValueError:
+        days = 30
+
+    data = await aget_dashboard_snapshot(days, enabled_sections(settings))
+
+    # Notifications
+    data['unread_notifications'] = await sync_to_async(NotificationCounter.unread_for)(user.id)
+
+    return JsonResponse(data, encoder=JSONEncoder)
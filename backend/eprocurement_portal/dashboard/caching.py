@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+DATA_VERSION_KEY = 'data-version:{}'
+SETTINGS_KEY = 'dashboard:settings:{}:{}'
+SETTINGS_LABEL = 'dashboard.settings:{}'
+
+
+def _version_key(label):
+    return DATA_VERSION_KEY.format(label.lower())
+
+
+def get_data_versions(labels):
+    """Return the current data version for each model label.
+
+    Missing counters are seeded with a timestamp rather than zero so that an
+    evicted counter can never line up with a value that was used before.
+    """
+    keys = {label: _version_key(label) for label in labels}
+    found = cache.get_many(keys.values())
+
+    versions = {}
+    for label, key in keys.items():
+        if key not in found:
+            cache.add(key, int(time.time() * 1000), timeout=None)
+            found[key] = cache.get(key)
+        versions[label] = found[key]
+    return versions
+
+
+def bump_data_version(*labels):
+    """Invalidate everything derived from the given models."""
+    for label in labels:
+        key = _version_key(label)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, int(time.time() * 1000), timeout=None)
+
+
+class LRUCache:
+    """A small thread-safe, size-bounded in-process LRU cache."""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+SETTINGS_FIELDS = (
+    'show_requisitions', 'show_vendors', 'show_inventory', 'show_orders', 'default_date_range'
+)
+
+_settings_cache = LRUCache(maxsize=getattr(settings, 'DASHBOARD_SETTINGS_CACHE_SIZE', 1024))
+
+
+def get_dashboard_settings(user_id):
+    """Return a user's dashboard settings as a dict of field values.
+
+    Looked up in a process-local LRU, then the shared cache, and only then
+    the database. Users without a settings row get the model defaults; the
+    row itself is created the first time they save their settings.
+    Local entries live for ``DASHBOARD_SETTINGS_CACHE_TTL`` seconds, which
+    bounds how long another process may serve settings after an update.
+    Shared entries are keyed by a per-user version that invalidation bumps,
+    so a read racing an update can only store under a version that is
+    already retired.
+    """
+    now = time.monotonic()
+    entry = _settings_cache.get(user_id)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+
+    label = SETTINGS_LABEL.format(user_id)
+    key = SETTINGS_KEY.format(user_id, get_data_versions([label])[label])
+    values = cache.get(key)
+    if values is None:
+        from .models import DashboardSettings
+
+        values = DashboardSettings.objects.filter(user_id=user_id).values(*SETTINGS_FIELDS).first()
+        if values is None:
+            values = {
+                field: DashboardSettings._meta.get_field(field).get_default()
+                for field in SETTINGS_FIELDS
+            }
+        cache.set(key, values)
+
+    ttl = getattr(settings, 'DASHBOARD_SETTINGS_CACHE_TTL', 60)
+    _settings_cache.set(user_id, (now + ttl, values))
+    return values
+
+
+def invalidate_dashboard_settings(user_id):
+    _settings_cache.pop(user_id)
+    bump_data_version(SETTINGS_LABEL.format(user_id))
@@ -0,0 +1,48 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Rows fetched from the database per round trip while streaming
+EXPORT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the caller."""
+    def write(self, value):
+        return value
+
+
+def _csv_lines(rows, fields):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([row[field] for field in fields])
+
+
+def _ndjson_lines(rows, fields):
+    for row in rows:
+        yield json.dumps({field: row[field] for field in fields}, cls=DjangoJSONEncoder) + '\n'
+
+
+def streaming_export(queryset, fields, export_format, filename):
+    """Stream a values() queryset as CSV or NDJSON.
+
+    The queryset is walked with ``iterator()`` so only one chunk of rows is
+    held in memory at a time, whatever the size of the result.
+    """
+    rows = queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    if export_format == 'csv':
+        lines = _csv_lines(rows, fields)
+    else:
+        lines = _ndjson_lines(rows, fields)
+
+    response = StreamingHttpResponse(lines, content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
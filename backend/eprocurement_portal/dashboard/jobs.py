@@ -0,0 +1,80 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import ReportJob, SavedReport
+from .reports import cached_report
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'REPORT_JOB_WORKERS', 2),
+                thread_name_prefix='report-job'
+            )
+    return _executor
+
+
+def enqueue_report_job(job):
+    """Run the job on the local worker pool once the job row is committed."""
+    transaction.on_commit(lambda: get_executor().submit(run_report_job, job.pk))
+
+
+def run_saved_report(saved_report):
+    """Re-run a saved report and store the result against it."""
+    # Imported here to avoid a circular import with views
+    from .views import GenerateReportView
+
+    result, _ = cached_report(
+        saved_report.report_type, saved_report.parameters, GenerateReportView().generate
+    )
+    saved_report.last_result = result
+    saved_report.last_run = timezone.now()
+    saved_report.save(update_fields=['last_result', 'last_run'])
+    return result
+
+
+def run_report_job(job_id):
+    # Imported here to avoid a circular import with views
+    from .views import GenerateReportView
+
+    close_old_connections()
+    try:
+        job = ReportJob.objects.get(pk=job_id)
+        job.status = ReportJob.RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+
+        try:
+            result, _ = cached_report(job.report_type, job.parameters, GenerateReportView().generate)
+        except Exception as exc:
+            logger.exception('Report job %s failed', job_id)
+            job.status = ReportJob.FAILED
+            job.error = str(exc)
+            job.finished_at = timezone.now()
+            job.save(update_fields=['status', 'error', 'finished_at'])
+            return
+
+        job.status = ReportJob.COMPLETE
+        job.result = result
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'result', 'finished_at'])
+
+        if job.saved_report_id:
+            SavedReport.objects.filter(pk=job.saved_report_id).update(
+                last_result=result,
+                last_run=job.finished_at
+            )
+    finally:
+        close_old_connections()
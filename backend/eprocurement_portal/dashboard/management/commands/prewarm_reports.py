@@ -0,0 +1,59 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from dashboard.jobs import run_saved_report
+from dashboard.models import SavedReport
+from dashboard.views import GenerateReportView
+
+
+class Command(BaseCommand):
+    help = 'Re-run saved reports so that opening them serves a pre-computed result.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Keep running and start a new pass every INTERVAL seconds. '
+                 'Runs a single pass when omitted.'
+        )
+        parser.add_argument(
+            '--max-age', type=int, default=0,
+            help='Only re-run reports whose last run is older than MAX_AGE minutes.'
+        )
+        parser.add_argument(
+            '--report-type', choices=GenerateReportView.report_types,
+            help='Only re-run reports of this type.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self.prewarm(options['max_age'], options['report_type'])
+            if not options['interval']:
+                break
+            close_old_connections()
+            time.sleep(options['interval'])
+
+    def prewarm(self, max_age, report_type):
+        queryset = SavedReport.objects.filter(report_type__in=GenerateReportView.report_types)
+        if report_type:
+            queryset = queryset.filter(report_type=report_type)
+        if max_age:
+            cutoff = timezone.now() - timedelta(minutes=max_age)
+            queryset = queryset.filter(Q(last_run__isnull=True) | Q(last_run__lt=cutoff))
+
+        refreshed = failed = 0
+        for saved_report in queryset.defer('last_result').iterator():
+            try:
+                run_saved_report(saved_report)
+                refreshed += 1
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f'Failed to run report {saved_report.pk} ({saved_report.name}): {exc}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Pre-warmed {refreshed} saved report(s), {failed} failed.'
+        ))
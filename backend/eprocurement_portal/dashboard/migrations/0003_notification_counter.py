@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def build_notification_counters(apps, schema_editor):
+    Notification = apps.get_model('dashboard', 'Notification')
+    NotificationCounter = apps.get_model('dashboard', 'NotificationCounter')
+    rows = Notification.objects.filter(read=False).values('user_id').annotate(
+        unread_count=Count('id')
+    ).order_by()
+    NotificationCounter.objects.bulk_create([
+        NotificationCounter(user_id=row['user_id'], unread_count=row['unread_count'])
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('dashboard', '0002_report_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Notification Counter',
+                'verbose_name_plural': 'Notification Counters',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'read', '-created_at'], name='notification_user_read_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at'], name='notification_user_created_idx'),
+        ),
+        migrations.RunPython(build_notification_counters, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,9 @@
-from django.db import models
+import uuid
+
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from rest_framework.utils.encoders import JSONEncoder
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 
@@ -47,9 +52,75 @@ class Notification(models.Model):
         verbose_name = _("Notification")
         verbose_name_plural = _("Notifications")
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'read', '-created_at'], name='notification_user_read_idx'),
+            models.Index(fields=['user', '-created_at'], name='notification_user_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.user.username}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored read flag so saves can keep the counter in step
+        if 'read' in field_names:
+            instance._loaded_read = instance.read
+        return instance
+
+class NotificationCounter(models.Model):
+    """Denormalized count of a user's unread notifications.
+    
+    Kept in step with Notification writes so the unread badge is a single
+    primary-key lookup.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='notification_counter'
+    )
+    unread_count = models.IntegerField(default=0)
+    
+    class Meta:
+        verbose_name = _("Notification Counter")
+        verbose_name_plural = _("Notification Counters")
+    
+    def __str__(self):
+        return f"{self.user_id}: {self.unread_count} unread"
+    
+    @classmethod
+    def unread_for(cls, user_id):
+        count = cls.objects.filter(user_id=user_id).values_list('unread_count', flat=True).first()
+        if count is None:
+            # No counter yet; build it from the notifications themselves
+            count = cls.rebuild(user_id)
+        return count
+    
+    @classmethod
+    def adjust(cls, user_id, delta):
+        """Atomically add ``delta`` to the user's unread count."""
+        if not delta:
+            return
+        # A missing counter is built from the notifications on first read,
+        # so there is nothing to adjust until then.
+        cls.objects.filter(user_id=user_id).update(
+            unread_count=F('unread_count') + delta
+        )
+    
+    @classmethod
+    def rebuild(cls, user_id):
+        # Create the row first so that notification writes racing with the
+        # rebuild adjust it, then lock it and recount in one transaction.
+        cls.objects.get_or_create(user_id=user_id)
+        count = Notification.objects.filter(user_id=OuterRef('user_id'), read=False).order_by().values(
+            'user_id'
+        ).annotate(count=Count('id')).values('count')
+        with transaction.atomic():
+            cls.objects.select_for_update().get(user_id=user_id)
+            counter = cls.objects.filter(user_id=user_id)
+            counter.update(unread_count=Coalesce(Subquery(count), 0))
+            return counter.values_list('unread_count', flat=True).get()
 
 class SavedReport(models.Model):
     REPORT_TYPES = [
@@ -70,6 +141,7 @@ class SavedReport(models.Model):
     parameters = models.JSONField()
     created_at = models.DateTimeField(auto_now_add=True)
     last_run = models.DateTimeField(null=True, blank=True)
+    last_result = models.JSONField(null=True, blank=True, encoder=JSONEncoder)
     
     class Meta:
         verbose_name = _("Saved Report")
@@ -77,4 +149,47 @@ class SavedReport(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.name} - {self.report_type}"
\ No newline at end of file
+        return f"{self.name} - {self.report_type}"
+
+class ReportJob(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETE = 'complete'
+    FAILED = 'failed'
+    
+    STATUS_CHOICES = [
+        (QUEUED, _('Queued')),
+        (RUNNING, _('Running')),
+        (COMPLETE, _('Complete')),
+        (FAILED, _('Failed')),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='report_jobs'
+    )
+    report_type = models.CharField(max_length=20, choices=SavedReport.REPORT_TYPES)
+    parameters = models.JSONField(default=dict)
+    saved_report = models.ForeignKey(
+        SavedReport,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs'
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    result = models.JSONField(null=True, blank=True, encoder=JSONEncoder)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = _("Report Job")
+        verbose_name_plural = _("Report Jobs")
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.report_type} job {self.id} - {self.status}"
\ No newline at end of file
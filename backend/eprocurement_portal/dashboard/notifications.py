@@ -0,0 +1,64 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+
+from .models import Notification, NotificationCounter
+from .streaming import broker
+
+# Rows per INSERT/UPDATE statement when fanning out
+NOTIFY_BATCH_SIZE = 500
+
+
+def notify_users(user_ids, type, title, message, link=''):
+    """Create the same notification for many users in batched inserts.
+
+    Returns the number of notifications created.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return 0
+
+    with transaction.atomic():
+        Notification.objects.bulk_create([
+            Notification(user_id=user_id, type=type, title=title, message=message, link=link)
+            for user_id in user_ids
+        ], batch_size=NOTIFY_BATCH_SIZE)
+
+        # bulk_create skips the signals that maintain the unread counters
+        for start in range(0, len(user_ids), NOTIFY_BATCH_SIZE):
+            NotificationCounter.objects.filter(
+                user_id__in=user_ids[start:start + NOTIFY_BATCH_SIZE]
+            ).update(unread_count=F('unread_count') + 1)
+
+        transaction.on_commit(partial(broker.publish, user_ids))
+
+    return len(user_ids)
+
+
+def notify_role(roles, type, title, message, link=''):
+    """Notify every active user holding one of ``roles``."""
+    if isinstance(roles, str):
+        roles = [roles]
+    user_ids = get_user_model().objects.filter(
+        role__in=roles, is_active=True
+    ).values_list('id', flat=True)
+    return notify_users(user_ids, type, title, message, link)
+
+
+def mark_read(user_id, ids=None, before=None):
+    """Mark a user's unread notifications as read in one UPDATE.
+
+    Limits the update to ``ids`` and/or notifications created at or before
+    ``before`` when given. Returns the number of notifications marked.
+    """
+    queryset = Notification.objects.filter(user_id=user_id, read=False)
+    if ids is not None:
+        queryset = queryset.filter(pk__in=ids)
+    if before is not None:
+        queryset = queryset.filter(created_at__lte=before)
+
+    updated = queryset.update(read=True)
+    NotificationCounter.adjust(user_id, -updated)
+    return updated
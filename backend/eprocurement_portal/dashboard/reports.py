@@ -0,0 +1,108 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from .caching import LRUCache, get_data_versions
+
+# Models each report type reads from; writes to any of them invalidate
+# cached results of that type.
+REPORT_MODELS = {
+    'requisitions': ('requisitions.Requisition',),
+    'inventory': ('inventory.InventoryItem', 'inventory.Category'),
+    'vendors': ('vendors.Vendor', 'orders.PurchaseOrder'),
+    'purchases': ('orders.PurchaseOrder', 'vendors.Vendor'),
+}
+
+report_cache = LRUCache(maxsize=getattr(settings, 'REPORT_CACHE_SIZE', 128))
+
+
+def report_fingerprint(report_type, parameters):
+    """Return a canonical hash of a report request."""
+    canonical = json.dumps(
+        [report_type, parameters], sort_keys=True, separators=(',', ':'), cls=JSONEncoder
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def cached_report(report_type, parameters, generate):
+    """Return ``(data, hit)`` for a report, calling ``generate`` on a miss.
+
+    Results are keyed by the request fingerprint plus the current data
+    version of every model the report reads, so they stay valid until one
+    of those models is written to. Entries also expire after
+    ``REPORT_CACHE_TTL`` seconds, which bounds how long a process may serve
+    a report when the version counters are not shared between processes.
+    """
+    labels = REPORT_MODELS[report_type]
+    versions = get_data_versions(labels)
+    key = (report_fingerprint(report_type, parameters), tuple(versions[label] for label in labels))
+
+    now = time.monotonic()
+    entry = report_cache.get(key)
+    if entry is not None and entry[0] > now:
+        return entry[1], True
+
+    data = generate(report_type, parameters)
+    ttl = getattr(settings, 'REPORT_CACHE_TTL', 60)
+    report_cache.set(key, (now + ttl, data))
+    return data, False
+
+
+def _add(left, right):
+    # Aggregates over empty groups come back as None
+    if left is None:
+        return right
+    if right is None:
+        return left
+    return left + right
+
+
+def single_pass_report(queryset, dimensions, measures):
+    """Compute the overall total and one breakdown per dimension in one query.
+
+    The queryset is grouped once by the combination of all ``dimensions``
+    and the finest-grained rows are folded in Python into the grand total
+    and a breakdown for each dimension, which emulates ``GROUPING SETS``.
+    ``measures`` maps output names to additive aggregates (``Count``,
+    ``Sum``); non-additive ones such as ``Avg`` would fold incorrectly.
+
+    Returns ``(total, breakdowns)`` where ``total`` maps each measure to its
+    value and ``breakdowns`` maps each dimension to a list of rows shaped
+    like ``queryset.values(dimension).annotate(**measures)``.
+    """
+    total = dict.fromkeys(measures)
+    buckets = {dimension: {} for dimension in dimensions}
+
+    rows = queryset.values(*dimensions).annotate(**measures).order_by() if dimensions \
+        else [queryset.aggregate(**measures)]
+
+    for row in rows:
+        for name in measures:
+            total[name] = _add(total[name], row[name])
+        for dimension in dimensions:
+            key = row[dimension]
+            bucket = buckets[dimension].get(key)
+            if bucket is None:
+                bucket = buckets[dimension][key] = dict.fromkeys(measures)
+                bucket[dimension] = key
+            for name in measures:
+                bucket[name] = _add(bucket[name], row[name])
+
+    breakdowns = {
+        dimension: [
+            {dimension: bucket[dimension], **{name: bucket[name] for name in measures}}
+            for bucket in dimension_buckets.values()
+        ]
+        for dimension, dimension_buckets in buckets.items()
+    }
+    return total, breakdowns
+
+
+def sort_rows(rows, key, reverse=False):
+    """Sort breakdown rows on ``key``, keeping None values last."""
+    present = [row for row in rows if row[key] is not None]
+    missing = [row for row in rows if row[key] is None]
+    return sorted(present, key=lambda row: row[key], reverse=reverse) + missing
@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from .models import DashboardSettings, Notification, SavedReport
+from eprocurement_portal.fieldsets import SparseFieldsMixin
+from django.urls import reverse
+from .models import DashboardSettings, Notification, SavedReport, ReportJob
 
 class DashboardSettingsSerializer(serializers.ModelSerializer):
     class Meta:
@@ -8,16 +10,39 @@ class DashboardSettingsSerializer(serializers.ModelSerializer):
                 'show_orders', 'default_date_range')
         read_only_fields = ('id',)
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = ('id', 'user', 'type', 'title', 'message', 'link',
                 'created_at', 'read')
         read_only_fields = ('id', 'user', 'created_at')
 
-class SavedReportSerializer(serializers.ModelSerializer):
+class SavedReportSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = SavedReport
         fields = ('id', 'user', 'name', 'report_type', 'parameters',
                 'created_at', 'last_run')
-        read_only_fields = ('id', 'user', 'created_at')
\ No newline at end of file
+        read_only_fields = ('id', 'user', 'created_at')
+
+class SavedReportDetailSerializer(SavedReportSerializer):
+    class Meta(SavedReportSerializer.Meta):
+        fields = SavedReportSerializer.Meta.fields + ('last_result',)
+        read_only_fields = SavedReportSerializer.Meta.read_only_fields + ('last_run', 'last_result')
+
+class ReportJobSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    status_url = serializers.SerializerMethodField()
+    result_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ReportJob
+        fields = ('id', 'report_type', 'parameters', 'saved_report', 'status',
+                'error', 'created_at', 'started_at', 'finished_at',
+                'status_url', 'result_url')
+        read_only_fields = fields
+        field_sources = {'status_url': (), 'result_url': ()}
+    
+    def get_status_url(self, obj):
+        return reverse('report-job-detail', args=[obj.pk])
+    
+    def get_result_url(self, obj):
+        return reverse('report-job-result', args=[obj.pk])
\ No newline at end of file
@@ -0,0 +1,86 @@
+from functools import partial
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, post_delete
+
+from .caching import bump_data_version, invalidate_dashboard_settings
+from .models import DashboardSettings, Notification, NotificationCounter
+from .streaming import broker
+from .reports import REPORT_MODELS
+from .snapshots import TRACKED_MODELS
+
+DEPENDENCY_MODELS = sorted(
+    set(TRACKED_MODELS) | {label for labels in REPORT_MODELS.values() for label in labels}
+)
+
+
+def invalidate_model_data(sender, **kwargs):
+    # Bump after commit so readers never rebuild from uncommitted rows.
+    transaction.on_commit(partial(bump_data_version, sender._meta.label))
+
+
+for label in DEPENDENCY_MODELS:
+    post_save.connect(invalidate_model_data, sender=label, dispatch_uid=f'dashboard-save-{label}')
+    post_delete.connect(invalidate_model_data, sender=label, dispatch_uid=f'dashboard-delete-{label}')
+
+
+# Adding or removing many-to-many links (a vendor's categories, say) only
+# writes the through table, so those changes invalidate the owning model.
+M2M_MODELS = {
+    field.remote_field.through: label
+    for label in DEPENDENCY_MODELS
+    for field in apps.get_model(label)._meta.local_many_to_many
+}
+
+
+def invalidate_m2m_data(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(partial(bump_data_version, M2M_MODELS[sender]))
+
+
+for through, label in M2M_MODELS.items():
+    m2m_changed.connect(invalidate_m2m_data, sender=through, dispatch_uid=f'dashboard-m2m-{through._meta.label}')
+
+
+# Line items change their parent's totals with a plain UPDATE, which sends
+# no signals, so item writes invalidate the parent's data instead.
+PARENT_MODELS = {
+    'orders.PurchaseOrderItem': 'orders.PurchaseOrder',
+    'requisitions.RequisitionItem': 'requisitions.Requisition',
+}
+
+
+def invalidate_parent_data(sender, **kwargs):
+    transaction.on_commit(partial(bump_data_version, PARENT_MODELS[sender._meta.label]))
+
+
+for label in PARENT_MODELS:
+    post_save.connect(invalidate_parent_data, sender=label, dispatch_uid=f'dashboard-save-{label}')
+    post_delete.connect(invalidate_parent_data, sender=label, dispatch_uid=f'dashboard-delete-{label}')
+
+
+def track_unread_on_save(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(partial(broker.publish, [instance.user_id]))
+    previous = True if created else getattr(instance, '_loaded_read', instance.read)
+    if previous != instance.read:
+        NotificationCounter.adjust(instance.user_id, -1 if instance.read else 1)
+    instance._loaded_read = instance.read
+
+
+def track_unread_on_delete(sender, instance, **kwargs):
+    if not getattr(instance, '_loaded_read', instance.read):
+        NotificationCounter.adjust(instance.user_id, -1)
+
+
+post_save.connect(track_unread_on_save, sender=Notification, dispatch_uid='notification-unread-save')
+post_delete.connect(track_unread_on_delete, sender=Notification, dispatch_uid='notification-unread-delete')
+
+
+def invalidate_settings(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidate_dashboard_settings, instance.user_id))
+
+
+post_save.connect(invalidate_settings, sender=DashboardSettings, dispatch_uid='dashboard-settings-save')
+post_delete.connect(invalidate_settings, sender=DashboardSettings, dispatch_uid='dashboard-settings-delete')
@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Count, F
+from django.utils import timezone
+
+from requisitions.models import Requisition
+from inventory.models import InventoryItem, InventoryTransaction
+from vendors.models import Vendor
+from orders.models import PurchaseOrder
+from orders.spend import spend_series
+from .caching import get_data_versions
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = 'dashboard:snapshot:{section}:{days}:{version}'
+
+
+def build_requisitions_section(start_date):
+    requisition_data = {}
+
+    # Count by status
+    status_counts = Requisition.objects.filter(
+        date_created__gte=start_date
+    ).values('status').annotate(count=Count('id'))
+
+    requisition_data['status_counts'] = {item['status']: item['count'] for item in status_counts}
+
+    # Recent requisitions
+    recent_requisitions = Requisition.objects.filter(
+        date_created__gte=start_date
+    ).order_by('-date_created')[:5].values(
+        'id', 'title', 'requester__username', 'status', 'date_created', 'priority', 'total_estimated_cost'
+    )
+
+    requisition_data['recent'] = list(recent_requisitions)
+
+    return requisition_data
+
+
+def build_vendors_section(start_date):
+    vendor_data = {}
+
+    # Count by status
+    status_counts = Vendor.objects.values('status').annotate(count=Count('id'))
+    vendor_data['status_counts'] = {item['status']: item['count'] for item in status_counts}
+
+    # Recent vendors
+    recent_vendors = Vendor.objects.order_by('-registration_date')[:5].values(
+        'id', 'company_name', 'status', 'registration_date'
+    )
+
+    vendor_data['recent'] = list(recent_vendors)
+
+    return vendor_data
+
+
+def build_inventory_section(start_date):
+    inventory_data = {}
+
+    # Low stock items
+    low_stock = InventoryItem.objects.filter(
+        current_quantity__lte=F('minimum_quantity'),
+        is_active=True
+    ).values('id', 'name', 'current_quantity', 'minimum_quantity')
+
+    inventory_data['low_stock'] = list(low_stock)
+
+    # Recent transactions
+    recent_transactions = InventoryTransaction.objects.select_related(
+        'item', 'created_by'
+    ).order_by('-transaction_date')[:10].values(
+        'id', 'item__name', 'transaction_type', 'quantity',
+        'transaction_date', 'created_by__username'
+    )
+
+    inventory_data['recent_transactions'] = list(recent_transactions)
+
+    return inventory_data
+
+
+def build_orders_section(start_date):
+    orders_data = {}
+
+    # Count by status
+    status_counts = PurchaseOrder.objects.filter(
+        date_created__gte=start_date
+    ).values('status').annotate(count=Count('id'))
+
+    orders_data['status_counts'] = {item['status']: item['count'] for item in status_counts}
+
+    # Recent orders
+    recent_orders = PurchaseOrder.objects.select_related('vendor').filter(
+        date_created__gte=start_date
+    ).order_by('-date_created')[:5].values(
+        'id', 'po_number', 'vendor__company_name', 'status',
+        'date_created', 'grand_total'
+    )
+
+    orders_data['recent'] = list(recent_orders)
+
+    # Total spend by month (for the past year)
+    year_ago = timezone.now() - timedelta(days=365)
+    monthly_spend = spend_series('month', start_date=timezone.localdate(year_ago))
+
+    orders_data['monthly_spend'] = [
+        {'month': row['period'], 'total': row['total']} for row in monthly_spend
+    ]
+
+    return orders_data
+
+
+# Each section lists the models it reads from, so a write only invalidates
+# the sections that actually depend on it. Sections that ignore the date
+# range are shared between all ranges.
+SECTIONS = {
+    'requisitions': {
+        'builder': build_requisitions_section,
+        'models': ('requisitions.Requisition',),
+        'uses_date_range': True,
+    },
+    'vendors': {
+        'builder': build_vendors_section,
+        'models': ('vendors.Vendor',),
+        'uses_date_range': False,
+    },
+    'inventory': {
+        'builder': build_inventory_section,
+        'models': ('inventory.InventoryItem', 'inventory.InventoryTransaction'),
+        'uses_date_range': False,
+    },
+    'orders': {
+        'builder': build_orders_section,
+        'models': ('orders.PurchaseOrder', 'vendors.Vendor'),
+        'uses_date_range': True,
+    },
+}
+
+TRACKED_MODELS = sorted({label for section in SECTIONS.values() for label in section['models']})
+
+
+def enabled_sections(settings):
+    """Return the names of the sections turned on in a user's settings."""
+    return [name for name in SECTIONS if settings[f'show_{name}']]
+
+
+def _snapshot_keys(days, sections):
+    versions = get_data_versions(TRACKED_MODELS)
+
+    keys = {}
+    for name in sections:
+        section = SECTIONS[name]
+        version = '.'.join(str(versions[label]) for label in section['models'])
+        keys[name] = SNAPSHOT_KEY.format(
+            section=name,
+            days=days if section['uses_date_range'] else '-',
+            version=version,
+        )
+    return keys
+
+
+def _build_section(name, key, start_date):
+    data = SECTIONS[name]['builder'](start_date)
+    cache.set(key, data, timeout=getattr(settings, 'DASHBOARD_SNAPSHOT_TTL', 60))
+    return data
+
+
+def get_dashboard_snapshot(days, sections):
+    """Return the summary sections for the given date range.
+
+    Sections are served from the cache and only rebuilt when one of the
+    models they depend on has changed, or when the snapshot has aged past
+    ``DASHBOARD_SNAPSHOT_TTL`` (the date window slides with the clock).
+    """
+    keys = _snapshot_keys(days, sections)
+    cached = cache.get_many(keys.values())
+
+    data = {}
+    start_date = timezone.now() - timedelta(days=days)
+    for name, key in keys.items():
+        if key in cached:
+            data[name] = cached[key]
+        else:
+            data[name] = _build_section(name, key, start_date)
+
+    return data
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_section_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'DASHBOARD_SECTION_WORKERS', 4),
+                thread_name_prefix='dashboard-section'
+            )
+    return _executor
+
+
+def _build_section_in_worker(name, key, start_date):
+    close_old_connections()
+    try:
+        return _build_section(name, key, start_date)
+    finally:
+        close_old_connections()
+
+
+async def aget_dashboard_snapshot(days, sections):
+    """Async variant of ``get_dashboard_snapshot`` that builds sections concurrently.
+
+    Sections missing from the cache are built side by side on a bounded
+    thread pool. A section that takes longer than ``DASHBOARD_SECTION_TIMEOUT``
+    seconds is reported as ``{'error': 'timeout'}`` instead of holding up the
+    rest; it keeps building in the background and is cached for later
+    requests.
+    """
+    keys = await sync_to_async(_snapshot_keys)(days, sections)
+    cached = await cache.aget_many(keys.values())
+
+    loop = asyncio.get_running_loop()
+    executor = get_section_executor()
+    timeout = getattr(settings, 'DASHBOARD_SECTION_TIMEOUT', 5)
+    start_date = timezone.now() - timedelta(days=days)
+
+    data = {}
+    pending = {}
+    for name, key in keys.items():
+        if key in cached:
+            data[name] = cached[key]
+        else:
+            future = loop.run_in_executor(executor, _build_section_in_worker, name, key, start_date)
+            pending[name] = asyncio.wait_for(future, timeout=timeout)
+
+    results = await asyncio.gather(*pending.values(), return_exceptions=True)
+    for name, result in zip(pending, results):
+        if isinstance(result, asyncio.TimeoutError):
+            data[name] = {'error': 'timeout'}
+        elif isinstance(result, Exception):
+            logger.exception('Dashboard section %s failed', name, exc_info=result)
+            data[name] = {'error': 'unavailable'}
+        else:
+            data[name] = result
+
+    return data
@@ -0,0 +1,188 @@
+import asyncio
+import json
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .models import Notification
+
+NOTIFICATION_FIELDS = ('id', 'user', 'type', 'title', 'message', 'link', 'created_at', 'read')
+
+# Most notifications sent in one event batch or poll response
+STREAM_BATCH_SIZE = 100
+
+
+class NotificationBroker:
+    """Wakes up streams in this process when a user gets a notification.
+
+    Waiters are asyncio events owned by the stream's event loop, while
+    publishers are ordinary (sync) code, so wake-ups are scheduled with
+    ``call_soon_threadsafe``. Streams also re-check the database on every
+    heartbeat, which covers notifications created by other processes.
+    """
+
+    def __init__(self):
+        self._waiters = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.setdefault(user_id, set()).add(waiter)
+        return waiter
+
+    def unsubscribe(self, user_id, waiter):
+        with self._lock:
+            waiters = self._waiters.get(user_id)
+            if waiters is not None:
+                waiters.discard(waiter)
+                if not waiters:
+                    del self._waiters[user_id]
+
+    def publish(self, user_ids):
+        with self._lock:
+            waiters = [
+                waiter
+                for user_id in set(user_ids) & self._waiters.keys()
+                for waiter in self._waiters[user_id]
+            ]
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+
+broker = NotificationBroker()
+
+
+def authenticate_request(request):
+    """Authenticate a plain Django request with the API's authenticators.
+
+    Browsers' EventSource cannot send headers, so an access token may also
+    be passed as ``?token=``. Returns the user, or None when anonymous.
+    """
+    token = request.GET.get('token')
+    if token and 'HTTP_AUTHORIZATION' not in request.META:
+        request.META['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+
+    drf_request = Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    try:
+        user = drf_request.user
+    except exceptions.AuthenticationFailed:
+        return None
+    return user if user.is_authenticated else None
+
+
+def _parse_cursor(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def _fetch_after(user_id, last_id):
+    queryset = Notification.objects.filter(
+        user_id=user_id, id__gt=last_id
+    ).order_by('id').values(*NOTIFICATION_FIELDS)[:STREAM_BATCH_SIZE]
+    return [row async for row in queryset]
+
+
+async def _latest_id(user_id):
+    latest = await Notification.objects.filter(user_id=user_id).order_by('-id').values_list(
+        'id', flat=True
+    ).afirst()
+    return latest or 0
+
+
+def _unauthorized():
+    return JsonResponse(
+        {'detail': 'Authentication credentials were not provided.'}, status=401
+    )
+
+
+async def notification_stream(request):
+    """Server-sent events stream of the user's new notifications.
+
+    Resumes after ``Last-Event-ID`` (or ``?after=<id>``) when given,
+    otherwise starts with notifications created from now on.
+    """
+    user = await sync_to_async(authenticate_request)(request)
+    if user is None:
+        return _unauthorized()
+
+    user_id = user.pk
+    last_id = _parse_cursor(request.headers.get('Last-Event-ID') or request.GET.get('after'))
+    if last_id is None:
+        last_id = await _latest_id(user_id)
+    heartbeat = getattr(settings, 'NOTIFICATION_STREAM_HEARTBEAT', 15)
+
+    async def events():
+        nonlocal last_id
+        _, event = waiter = broker.subscribe(user_id)
+        try:
+            yield f'retry: {heartbeat * 1000}\n\n'
+            while True:
+                event.clear()
+                rows = await _fetch_after(user_id, last_id)
+                for row in rows:
+                    last_id = row['id']
+                    data = json.dumps(row, cls=DjangoJSONEncoder)
+                    yield f'id: {last_id}\nevent: notification\ndata: {data}\n\n'
+                if len(rows) == STREAM_BATCH_SIZE:
+                    continue
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+        finally:
+            broker.unsubscribe(user_id, waiter)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def notification_poll(request):
+    """Long-poll for notifications newer than ``?after=<id>``.
+
+    Returns as soon as there is something new, or with an empty list
+    after ``?timeout=`` seconds (capped by NOTIFICATION_POLL_TIMEOUT).
+    """
+    user = await sync_to_async(authenticate_request)(request)
+    if user is None:
+        return _unauthorized()
+
+    user_id = user.pk
+    max_timeout = getattr(settings, 'NOTIFICATION_POLL_TIMEOUT', 25)
+    timeout = _parse_cursor(request.GET.get('timeout'))
+    timeout = max_timeout if timeout is None else max(0, min(timeout, max_timeout))
+    last_id = _parse_cursor(request.GET.get('after'))
+    if last_id is None:
+        last_id = await _latest_id(user_id)
+
+    _, event = waiter = broker.subscribe(user_id)
+    try:
+        rows = await _fetch_after(user_id, last_id)
+        if not rows and timeout:
+            try:
+                await asyncio.wait_for(event.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                rows = await _fetch_after(user_id, last_id)
+    finally:
+        broker.unsubscribe(user_id, waiter)
+
+    if rows:
+        last_id = rows[-1]['id']
+    return JsonResponse(
+        {'cursor': last_id, 'results': rows}, encoder=DjangoJSONEncoder
+    )
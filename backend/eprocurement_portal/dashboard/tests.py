@@ -1,3 +1,33 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import ReportJob
+
+User = get_user_model()
+
+
+class ReportJobResultTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('officer', 'officer@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def result_url(self, job):
+        return f'/api/dashboard/reports/jobs/{job.pk}/result/'
+
+    def test_failed_job_is_reported_as_a_normal_response(self):
+        job = ReportJob.objects.create(
+            user=self.user, report_type='requisitions',
+            status=ReportJob.FAILED, error='Report failed'
+        )
+        response = self.client.get(self.result_url(job))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'status': ReportJob.FAILED, 'error': 'Report failed'})
+
+    def test_unfinished_job_is_accepted(self):
+        job = ReportJob.objects.create(user=self.user, report_type='requisitions')
+        response = self.client.get(self.result_url(job))
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data, {'status': ReportJob.QUEUED})
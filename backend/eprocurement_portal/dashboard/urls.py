@@ -1,14 +1,25 @@
 from django.urls import path
 from .views import (
     DashboardSummaryView, DashboardSettingsView, NotificationListView,
-    SavedReportListView, GenerateReportView, MarkNotificationReadView
+    SavedReportListView, SavedReportDetailView, GenerateReportView, MarkNotificationReadView,
+    SpendTrendView, BulkMarkNotificationsReadView, ReportJobDetailView, ReportJobResultView
 )
+from .async_views import dashboard_summary
+from .streaming import notification_stream, notification_poll
 
 urlpatterns = [
     path('', DashboardSummaryView.as_view(), name='dashboard-summary'),
+    path('async/', dashboard_summary, name='dashboard-summary-async'),
+    path('spend/', SpendTrendView.as_view(), name='spend-trend'),
     path('settings/', DashboardSettingsView.as_view(), name='dashboard-settings'),
     path('notifications/', NotificationListView.as_view(), name='notifications'),
+    path('notifications/stream/', notification_stream, name='notification-stream'),
+    path('notifications/poll/', notification_poll, name='notification-poll'),
+    path('notifications/read/', BulkMarkNotificationsReadView.as_view(), name='mark-notifications-read'),
     path('notifications/<int:pk>/read/', MarkNotificationReadView.as_view(), name='mark-notification-read'),
     path('reports/', SavedReportListView.as_view(), name='saved-reports'),
+    path('reports/<int:pk>/', SavedReportDetailView.as_view(), name='saved-report-detail'),
     path('reports/generate/', GenerateReportView.as_view(), name='generate-report'),
+    path('reports/jobs/<uuid:pk>/', ReportJobDetailView.as_view(), name='report-job-detail'),
+    path('reports/jobs/<uuid:pk>/result/', ReportJobResultView.as_view(), name='report-job-result'),
 ]
\ No newline at end of file
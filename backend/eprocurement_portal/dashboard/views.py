@@ -2,178 +2,103 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
+from eprocurement_portal.fieldsets import SparseQuerysetMixin
 from django.shortcuts import get_object_or_404
-from django.db.models import Count, Sum, Avg, Q, F, Case, When, BooleanField
+from django.db.models import Count, Sum, Avg, Q, F, Case, When, BooleanField, DateField
+from django.db.models.functions import TruncMonth
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from datetime import timedelta
-from .models import DashboardSettings, Notification, SavedReport
+from eprocurement_portal.pagination import KeysetPagination
+from .models import DashboardSettings, Notification, NotificationCounter, SavedReport, ReportJob
+from .notifications import mark_read
 from .serializers import (
-    DashboardSettingsSerializer, NotificationSerializer, SavedReportSerializer
+    DashboardSettingsSerializer, NotificationSerializer, SavedReportSerializer,
+    SavedReportDetailSerializer, ReportJobSerializer
 )
 from requisitions.models import Requisition
 from inventory.models import InventoryItem, InventoryTransaction
 from vendors.models import Vendor
 from orders.models import PurchaseOrder
+from orders.spend import PERIODS, spend_series
+from .jobs import enqueue_report_job, run_saved_report
+from .exports import EXPORT_FORMATS, streaming_export
+from .reports import cached_report, single_pass_report, sort_rows
+from .caching import get_dashboard_settings
+from .snapshots import enabled_sections, get_dashboard_snapshot
 
 class DashboardSummaryView(APIView):
     """API endpoint for retrieving a summary of the dashboard data."""
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        # Get dashboard settings or create default
-        settings, _ = DashboardSettings.objects.get_or_create(
-            user=request.user,
-            defaults={
-                'show_requisitions': True,
-                'show_vendors': True,
-                'show_inventory': True,
-                'show_orders': True,
-                'default_date_range': 30
-            }
-        )
+        # Cached dashboard settings (defaults when the user has none yet)
+        settings = get_dashboard_settings(request.user.id)
         
         # Default date range is 30 days if not specified
-        days = request.query_params.get('days', settings.default_date_range)
+        days = request.query_params.get('days', settings['default_date_range'])
         try:
             days = int(days)
         except ValueError:
             days = 30
             
-        start_date = timezone.now() - timedelta(days=days)
-        
-        data = {}
-        
-        # Requisition summary
-        if settings.show_requisitions:
-            requisition_data = {}
-            
-            # Count by status
-            status_counts = Requisition.objects.filter(
-                date_created__gte=start_date
-            ).values('status').annotate(count=Count('id'))
-            
-            requisition_data['status_counts'] = {item['status']: item['count'] for item in status_counts}
-            
-            # Recent requisitions
-            recent_requisitions = Requisition.objects.filter(
-                date_created__gte=start_date
-            ).order_by('-date_created')[:5].values(
-                'id', 'title', 'requester__username', 'status', 'date_created', 'priority', 'total_estimated_cost'
-            )
-            
-            requisition_data['recent'] = list(recent_requisitions)
-            
-            data['requisitions'] = requisition_data
-            
-        # Vendor summary
-        if settings.show_vendors:
-            vendor_data = {}
-            
-            # Count by status
-            status_counts = Vendor.objects.values('status').annotate(count=Count('id'))
-            vendor_data['status_counts'] = {item['status']: item['count'] for item in status_counts}
-            
-            # Recent vendors
-            recent_vendors = Vendor.objects.order_by('-registration_date')[:5].values(
-                'id', 'company_name', 'status', 'registration_date'
-            )
-            
-            vendor_data['recent'] = list(recent_vendors)
-            
-            data['vendors'] = vendor_data
-            
-        # Inventory summary
-        if settings.show_inventory:
-            inventory_data = {}
-            
-            # Low stock items
-            low_stock = InventoryItem.objects.filter(
-                current_quantity__lte=F('minimum_quantity'),
-                is_active=True
-            ).values('id', 'name', 'current_quantity', 'minimum_quantity')
-            
-            inventory_data['low_stock'] = list(low_stock)
-            
-            # Recent transactions
-            recent_transactions = InventoryTransaction.objects.select_related(
-                'item', 'created_by'
-            ).order_by('-transaction_date')[:10].values(
-                'id', 'item__name', 'transaction_type', 'quantity', 
-                'transaction_date', 'created_by__username'
-            )
-            
-            inventory_data['recent_transactions'] = list(recent_transactions)
-            
-            data['inventory'] = inventory_data
-            
-        # Purchase Order summary
-        if settings.show_orders:
-            orders_data = {}
-            
-            # Count by status
-            status_counts = PurchaseOrder.objects.filter(
-                date_created__gte=start_date
-            ).values('status').annotate(count=Count('id'))
-            
-            orders_data['status_counts'] = {item['status']: item['count'] for item in status_counts}
-            
-            # Recent orders
-            recent_orders = PurchaseOrder.objects.select_related('vendor').filter(
-                date_created__gte=start_date
-            ).order_by('-date_created')[:5].values(
-                'id', 'po_number', 'vendor__company_name', 'status', 
-                'date_created', 'grand_total'
-            )
-            
-            orders_data['recent'] = list(recent_orders)
-            
-            # Total spend by month (for the past year)
-            year_ago = timezone.now() - timedelta(days=365)
-            monthly_spend = PurchaseOrder.objects.filter(
-                date_created__gte=year_ago,
-                status__in=['partial', 'complete']
-            ).extra(
-                select={'month': "EXTRACT(month FROM date_created)"}
-            ).values('month').annotate(
-                total=Sum('grand_total')
-            ).order_by('month')
-            
-            orders_data['monthly_spend'] = list(monthly_spend)
-            
-            data['orders'] = orders_data
+        data = get_dashboard_snapshot(days, enabled_sections(settings))
             
         # Notifications
-        unread_count = Notification.objects.filter(
-            user=request.user,
-            read=False
-        ).count()
-        
-        data['unread_notifications'] = unread_count
+        data['unread_notifications'] = NotificationCounter.unread_for(request.user.id)
         
         return Response(data)
 
+class SpendTrendView(APIView):
+    """API endpoint for spend totals by month, quarter or year."""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        period = request.query_params.get('period', 'month')
+        if period not in PERIODS:
+            return Response({
+                'error': f'Invalid period. Use one of: {", ".join(PERIODS)}.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        dates = {}
+        for param in ('start_date', 'end_date'):
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            try:
+                dates[param] = parse_date(value)
+            except ValueError:
+                dates[param] = None
+            if dates[param] is None:
+                return Response({
+                    'error': f'Invalid {param}. Use YYYY-MM-DD.'
+                }, status=status.HTTP_400_BAD_REQUEST)
+        
+        series = spend_series(period, **dates)
+        
+        return Response({
+            'period': period,
+            'series': series,
+        })
+
 class DashboardSettingsView(generics.RetrieveUpdateAPIView):
     """API endpoint for retrieving and updating dashboard settings."""
     serializer_class = DashboardSettingsSerializer
     permission_classes = [IsAuthenticated]
     
     def get_object(self):
-        settings, created = DashboardSettings.objects.get_or_create(
-            user=self.request.user,
-            defaults={
-                'show_requisitions': True,
-                'show_vendors': True,
-                'show_inventory': True,
-                'show_orders': True,
-                'default_date_range': 30
-            }
-        )
+        # Users without saved settings see the defaults; the row is only
+        # created when they first update them.
+        settings = DashboardSettings.objects.filter(user=self.request.user).first()
+        if settings is None:
+            settings = DashboardSettings(user=self.request.user)
         return settings
 
 class NotificationListView(generics.ListAPIView):
-    """API endpoint for listing notifications."""
+    """API endpoint for listing notifications, newest first, a page at a time."""
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         user = self.request.user
@@ -185,27 +110,63 @@ class NotificationListView(generics.ListAPIView):
             read = read.lower() == 'true'
             queryset = queryset.filter(read=read)
             
-        return queryset.order_by('-created_at')
+        return queryset.order_by('-created_at', '-id')
 
 class MarkNotificationReadView(APIView):
     """API endpoint for marking a notification as read."""
     permission_classes = [IsAuthenticated]
     
     def post(self, request, pk):
-        notification = get_object_or_404(
-            Notification, 
-            pk=pk, 
-            user=request.user
-        )
-        
-        notification.read = True
-        notification.save()
+        if not mark_read(request.user.id, ids=[pk]):
+            # Already read, or not this user's notification
+            get_object_or_404(Notification, pk=pk, user=request.user)
         
         return Response({
             'message': 'Notification marked as read'
         }, status=status.HTTP_200_OK)
 
-class SavedReportListView(generics.ListCreateAPIView):
+class BulkMarkNotificationsReadView(APIView):
+    """API endpoint for marking many notifications as read at once.
+    
+    Accepts ``ids`` (a list of notification ids), ``before`` (a timestamp;
+    everything created at or before it) or ``all: true``.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        ids = request.data.get('ids')
+        before = request.data.get('before')
+        mark_all = request.data.get('all', False)
+        
+        if ids is None and before is None and not mark_all:
+            return Response({
+                'error': 'Specify "ids", "before" or "all".'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if ids is not None and (
+            not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids)
+        ):
+            return Response({
+                'error': '"ids" must be a list of notification ids.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if before is not None:
+            before = parse_datetime(str(before))
+            if before is None:
+                return Response({
+                    'error': '"before" must be an ISO 8601 timestamp.'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(before):
+                before = timezone.make_aware(before)
+        
+        updated = mark_read(request.user.id, ids=ids, before=before)
+        
+        return Response({
+            'message': f'{updated} notification(s) marked as read',
+            'updated': updated
+        }, status=status.HTTP_200_OK)
+
+class SavedReportListView(SparseQuerysetMixin, generics.ListCreateAPIView):
     """API endpoint for listing and creating saved reports."""
     serializer_class = SavedReportSerializer
     permission_classes = [IsAuthenticated]
@@ -217,12 +178,55 @@ class SavedReportListView(generics.ListCreateAPIView):
         serializer.save(user=self.request.user)
 
 class SavedReportDetailView(generics.RetrieveUpdateDestroyAPIView):
-    """API endpoint for retrieving, updating, and deleting a saved report."""
-    serializer_class = SavedReportSerializer
+    """API endpoint for retrieving, updating, and deleting a saved report.
+    
+    Serves the last stored result; pass ``?refresh=true`` to recompute it.
+    """
+    serializer_class = SavedReportDetailSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
         return SavedReport.objects.filter(user=self.request.user)
+    
+    def retrieve(self, request, *args, **kwargs):
+        saved_report = self.get_object()
+        
+        refresh = request.query_params.get('refresh', '').lower() == 'true'
+        if (refresh or saved_report.last_result is None) and \
+                saved_report.report_type in GenerateReportView.report_types:
+            run_saved_report(saved_report)
+        
+        return Response(self.get_serializer(saved_report).data)
+
+class ReportJobDetailView(generics.RetrieveAPIView):
+    """API endpoint for polling the status of a background report job."""
+    serializer_class = ReportJobSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return ReportJob.objects.filter(user=self.request.user).defer('result')
+
+class ReportJobResultView(APIView):
+    """API endpoint for fetching the result of a finished report job.
+    
+    A job that failed is reported with ``status: 'failed'`` and its error;
+    the request itself still succeeded.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        job = get_object_or_404(ReportJob, pk=pk, user=request.user)
+        
+        if job.status == ReportJob.COMPLETE:
+            return Response(job.result)
+        if job.status == ReportJob.FAILED:
+            return Response({
+                'status': job.status,
+                'error': job.error
+            })
+        return Response({
+            'status': job.status
+        }, status=status.HTTP_202_ACCEPTED)
 
 class GenerateReportView(APIView):
     """API endpoint for generating reports."""
@@ -233,21 +237,44 @@ class GenerateReportView(APIView):
         parameters = request.data.get('parameters', {})
         save_report = request.data.get('save_report', False)
         report_name = request.data.get('report_name', '')
+        export_format = request.data.get('export')
+        run_async = str(request.data.get('async', '')).lower() in ('true', '1')
         
-        # Generate report data based on type
-        if report_type == 'requisitions':
-            data = self._generate_requisitions_report(parameters)
-        elif report_type == 'inventory':
-            data = self._generate_inventory_report(parameters)
-        elif report_type == 'vendors':
-            data = self._generate_vendors_report(parameters)
-        elif report_type == 'purchases':
-            data = self._generate_purchases_report(parameters)
-        else:
+        # Stream the detail rows instead of building the report in memory
+        if export_format:
+            return self._export_report(report_type, parameters, export_format)
+        
+        if report_type not in self.report_types:
             return Response({
                 'error': 'Invalid report type'
             }, status=status.HTTP_400_BAD_REQUEST)
         
+        # Hand long-running reports to the worker pool
+        if run_async:
+            saved_report = None
+            if save_report and report_name:
+                saved_report = SavedReport.objects.create(
+                    user=request.user,
+                    name=report_name,
+                    report_type=report_type,
+                    parameters=parameters
+                )
+            job = ReportJob.objects.create(
+                user=request.user,
+                report_type=report_type,
+                parameters=parameters,
+                saved_report=saved_report
+            )
+            enqueue_report_job(job)
+            return Response(
+                ReportJobSerializer(job, context={'request': request}).data,
+                status=status.HTTP_202_ACCEPTED
+            )
+        
+        # Generate report data based on type, reusing a cached result
+        # when none of the underlying data has changed
+        data, cache_hit = cached_report(report_type, parameters, self.generate)
+        
         # Save the report if requested
         if save_report and report_name:
             SavedReport.objects.create(
@@ -255,10 +282,64 @@ class GenerateReportView(APIView):
                 name=report_name,
                 report_type=report_type,
                 parameters=parameters,
-                last_run=timezone.now()
+                last_run=timezone.now(),
+                last_result=data
             )
         
-        return Response(data)
+        return Response(data, headers={'X-Report-Cache': 'hit' if cache_hit else 'miss'})
+    
+    report_types = ('requisitions', 'inventory', 'vendors', 'purchases')
+    
+    def generate(self, report_type, parameters):
+        """Build the report data for ``report_type``."""
+        if report_type == 'requisitions':
+            return self._generate_requisitions_report(parameters)
+        elif report_type == 'inventory':
+            return self._generate_inventory_report(parameters)
+        elif report_type == 'vendors':
+            return self._generate_vendors_report(parameters)
+        elif report_type == 'purchases':
+            return self._generate_purchases_report(parameters)
+        raise ValueError(f'Invalid report type: {report_type}')
+    
+    def _export_report(self, report_type, parameters, export_format):
+        if export_format not in EXPORT_FORMATS:
+            return Response({
+                'error': f'Invalid export format. Use one of: {", ".join(EXPORT_FORMATS)}.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if report_type == 'inventory':
+            rows = self._inventory_items(self._inventory_queryset(parameters))
+            fields = [
+                'name', 'sku', 'current_quantity', 'minimum_quantity', 'unit_price',
+                'is_active', 'category__name', 'value', 'needs_reorder'
+            ]
+            filename = 'inventory-items'
+        elif report_type == 'purchases':
+            rows = self._purchases_by_vendor(self._purchases_queryset(parameters))
+            fields = ['vendor__company_name', 'count', 'value']
+            filename = 'purchases-by-vendor'
+        else:
+            return Response({
+                'error': 'Export is only available for inventory and purchases reports.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return streaming_export(rows, fields, export_format, filename)
+    
+    def _requested_breakdowns(self, parameters, available):
+        """Return the breakdowns to compute, keyed by their response key.
+        
+        All breakdowns are computed unless ``parameters['breakdowns']`` names
+        a subset, as a list or a comma-separated string; fewer breakdowns
+        means fewer groups in the single scan.
+        """
+        requested = parameters.get('breakdowns')
+        if not requested:
+            return available
+        if isinstance(requested, str):
+            requested = requested.split(',')
+        requested = {str(key).strip() for key in requested}
+        return {key: dimension for key, dimension in available.items() if key in requested}
     
     def _generate_requisitions_report(self, parameters):
         # Example implementation - customize based on your needs
@@ -282,34 +363,25 @@ class GenerateReportView(APIView):
             queryset = queryset.filter(department=department)
         
         # Generate report data
-        total_count = queryset.count()
-        total_value = queryset.aggregate(total=Sum('total_estimated_cost'))['total'] or 0
-        
-        by_status = queryset.values('status').annotate(
-            count=Count('id'),
-            value=Sum('total_estimated_cost')
-        )
-        
-        by_department = queryset.values('department').annotate(
-            count=Count('id'),
-            value=Sum('total_estimated_cost')
-        )
-        
-        by_priority = queryset.values('priority').annotate(
-            count=Count('id'),
-            value=Sum('total_estimated_cost')
-        )
-        
-        return {
-            'total_count': total_count,
-            'total_value': float(total_value),
-            'by_status': list(by_status),
-            'by_department': list(by_department),
-            'by_priority': list(by_priority),
+        breakdowns = self._requested_breakdowns(parameters, {
+            'by_status': 'status',
+            'by_department': 'department',
+            'by_priority': 'priority',
+        })
+        total, rows = single_pass_report(queryset, list(breakdowns.values()), {
+            'count': Count('id'),
+            'value': Sum('total_estimated_cost'),
+        })
+        
+        data = {
+            'total_count': total['count'] or 0,
+            'total_value': float(total['value'] or 0),
         }
+        for key, dimension in breakdowns.items():
+            data[key] = rows[dimension]
+        return data
     
-    def _generate_inventory_report(self, parameters):
-        # Example implementation - customize based on your needs
+    def _inventory_queryset(self, parameters):
         queryset = InventoryItem.objects.all()
         
         # Apply filters from parameters
@@ -325,19 +397,10 @@ class GenerateReportView(APIView):
         if needs_reorder:
             queryset = queryset.filter(current_quantity__lte=F('minimum_quantity'))
         
-        # Generate report data
-        total_count = queryset.count()
-        total_value = queryset.aggregate(
-            total=Sum(F('current_quantity') * F('unit_price'))
-        )['total'] or 0
-        
-        by_category = queryset.values('category__name').annotate(
-            count=Count('id'),
-            value=Sum(F('current_quantity') * F('unit_price')),
-            quantity=Sum('current_quantity')
-        )
-        
-        items_detail = queryset.values(
+        return queryset
+    
+    def _inventory_items(self, queryset):
+        return queryset.values(
             'name', 'sku', 'current_quantity', 'minimum_quantity',
             'unit_price', 'is_active', 'category__name'
         ).annotate(
@@ -348,13 +411,31 @@ class GenerateReportView(APIView):
                 output_field=BooleanField()
             )
         )
+    
+    def _generate_inventory_report(self, parameters):
+        # Example implementation - customize based on your needs
+        queryset = self._inventory_queryset(parameters)
         
-        return {
-            'total_count': total_count,
-            'total_value': float(total_value),
-            'by_category': list(by_category),
-            'items': list(items_detail),
+        # Generate report data
+        breakdowns = self._requested_breakdowns(parameters, {
+            'by_category': 'category__name',
+        })
+        total, rows = single_pass_report(queryset, list(breakdowns.values()), {
+            'count': Count('id'),
+            'value': Sum(F('current_quantity') * F('unit_price')),
+            'quantity': Sum('current_quantity'),
+        })
+        
+        items_detail = self._inventory_items(queryset)
+        
+        data = {
+            'total_count': total['count'] or 0,
+            'total_value': float(total['value'] or 0),
         }
+        for key, dimension in breakdowns.items():
+            data[key] = rows[dimension]
+        data['items'] = list(items_detail)
+        return data
     
     def _generate_vendors_report(self, parameters):
         # Implementation for vendors report
@@ -370,8 +451,12 @@ class GenerateReportView(APIView):
             queryset = queryset.filter(categories__id=category_id)
         
         # Basic counts
-        total_count = queryset.count()
-        by_status = queryset.values('status').annotate(count=Count('id'))
+        breakdowns = self._requested_breakdowns(parameters, {
+            'by_status': 'status',
+        })
+        total, rows = single_pass_report(queryset, list(breakdowns.values()), {
+            'count': Count('id'),
+        })
         
         # Get purchase orders by vendor
         po_by_vendor = PurchaseOrder.objects.values(
@@ -381,14 +466,15 @@ class GenerateReportView(APIView):
             total_value=Sum('grand_total')
         ).order_by('-total_value')[:10]
         
-        return {
-            'total_count': total_count,
-            'by_status': list(by_status),
-            'top_vendors_by_orders': list(po_by_vendor),
+        data = {
+            'total_count': total['count'] or 0,
         }
+        for key, dimension in breakdowns.items():
+            data[key] = rows[dimension]
+        data['top_vendors_by_orders'] = list(po_by_vendor)
+        return data
     
-    def _generate_purchases_report(self, parameters):
-        # Implementation for purchases report
+    def _purchases_queryset(self, parameters):
         queryset = PurchaseOrder.objects.all()
         
         # Apply filters
@@ -408,33 +494,44 @@ class GenerateReportView(APIView):
         if vendor_id:
             queryset = queryset.filter(vendor_id=vendor_id)
         
-        # Generate report data
-        total_count = queryset.count()
-        total_value = queryset.aggregate(total=Sum('grand_total'))['total'] or 0
-        
-        by_status = queryset.values('status').annotate(
-            count=Count('id'),
-            value=Sum('grand_total')
-        )
-        
-        by_vendor = queryset.values(
+        return queryset
+    
+    def _purchases_by_vendor(self, queryset):
+        return queryset.values(
             'vendor__company_name'
         ).annotate(
             count=Count('id'),
             value=Sum('grand_total')
         ).order_by('-value')
+    
+    def _generate_purchases_report(self, parameters):
+        # Implementation for purchases report
+        queryset = self._purchases_queryset(parameters)
         
-        monthly_breakdown = queryset.extra(
-            select={'month': "EXTRACT(month FROM date_created)"}
-        ).values('month').annotate(
-            count=Count('id'),
-            value=Sum('grand_total')
-        ).order_by('month')
-        
-        return {
-            'total_count': total_count,
-            'total_value': float(total_value),
-            'by_status': list(by_status),
-            'by_vendor': list(by_vendor),
-            'monthly_breakdown': list(monthly_breakdown),
-        }
\ No newline at end of file
+        # Generate report data
+        breakdowns = self._requested_breakdowns(parameters, {
+            'by_status': 'status',
+            'by_vendor': 'vendor__company_name',
+            'monthly_breakdown': 'month',
+        })
+        if 'monthly_breakdown' in breakdowns:
+            queryset = queryset.annotate(
+                month=TruncMonth('date_created', output_field=DateField())
+            )
+        total, rows = single_pass_report(queryset, list(breakdowns.values()), {
+            'count': Count('id'),
+            'value': Sum('grand_total'),
+        })
+        
+        if 'by_vendor' in breakdowns:
+            rows['vendor__company_name'] = sort_rows(rows['vendor__company_name'], 'value', reverse=True)
+        if 'monthly_breakdown' in breakdowns:
+            rows['month'] = sort_rows(rows['month'], 'month')
+        
+        data = {
+            'total_count': total['count'] or 0,
+            'total_value': float(total['value'] or 0),
+        }
+        for key, dimension in breakdowns.items():
+            data[key] = rows[dimension]
+        return data
\ No newline at end of file
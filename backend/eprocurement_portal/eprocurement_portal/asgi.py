@@ -3,6 +3,11 @@ ASGI config for eprocurement_portal project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the project through this module (e.g. ``uvicorn
+eprocurement_portal.asgi:application``) for the notification stream and
+long-poll endpoints, which hold connections open without tying up a worker,
+and for the async dashboard summary, which builds its sections concurrently.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
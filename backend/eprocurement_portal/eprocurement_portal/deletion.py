@@ -0,0 +1,9 @@
+def deleted_directly(instance, origin):
+    """Whether a delete started from the instance itself (or a queryset of its model).
+
+    ``origin`` is the argument Django passes to ``post_delete`` receivers.
+    Line items are otherwise only deleted by cascade from their parent, in
+    which case the parent is going away too and needs no adjusting.
+    """
+    model = getattr(origin, 'model', type(origin))
+    return model is type(instance)
@@ -0,0 +1,198 @@
+"""Sparse fieldsets (``?fields=``) and on-demand expansion (``?expand=``).
+
+Both parameters take comma-separated field names; dotted names reach into
+nested serializers, e.g. ``?fields=id,title,items.item_name``. Without
+either parameter responses are unchanged. With one of them, a serializer
+returns only the fields named in ``fields`` (or all of its fields when
+none are named at that level) and leaves out its ``Meta.expandable_fields``
+unless they are listed in ``expand``.
+
+``SparseFieldsMixin`` trims serializer output. ``SparseQuerysetMixin``
+trims the matching query for list and detail views: it loads only the
+columns the remaining fields read (``only()``), joins forward relations
+(``select_related()``) and prefetches nested collections only when they
+are part of the response.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch, QuerySet
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def _parse(value):
+    """Turn ``a,b,c.d`` into ``{'': {'a', 'b', 'c'}, 'c': {'d'}}``."""
+    tree = {}
+    for name in filter(None, (part.strip() for part in value.split(','))):
+        parts = name.split('.')
+        for depth, part in enumerate(parts):
+            tree.setdefault('.'.join(parts[:depth]), set()).add(part)
+    return tree
+
+
+def get_sparse_spec(request):
+    """Return ``(fields, expand)`` trees for a request, or None when not requested."""
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return None
+    params = request.query_params
+    if FIELDS_PARAM not in params and EXPAND_PARAM not in params:
+        return None
+    return _parse(params.get(FIELDS_PARAM, '')), _parse(params.get(EXPAND_PARAM, ''))
+
+
+class SparseFieldsMixin:
+    """Serializer mixin applying ``?fields=`` and ``?expand=`` to its output.
+
+    ``Meta.expandable_fields`` lists the nested fields left out of sparse
+    responses unless expanded. ``Meta.field_sources`` maps fields that are
+    not plain model attributes (method fields, properties) to the ORM paths
+    they read, so the view can still narrow the query when they are shown.
+    """
+
+    def _field_path(self):
+        parts = []
+        node = self
+        while node.parent is not None:
+            if node.field_name:
+                parts.insert(0, node.field_name)
+            node = node.parent
+        return '.'.join(parts)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        spec = get_sparse_spec(self.context.get('request'))
+        if spec is None:
+            return fields
+
+        path = self._field_path()
+        requested = spec[0].get(path)
+        expanded = spec[1].get(path, set())
+        expandable = set(getattr(self.Meta, 'expandable_fields', ()))
+
+        if requested:
+            keep = requested | expanded
+        else:
+            keep = set(fields) - (expandable - expanded)
+        for name in list(fields):
+            if name not in keep:
+                fields.pop(name)
+        return fields
+
+
+class QueryPlan:
+    """Columns, joins and prefetches needed to serialize one model."""
+
+    def __init__(self, model):
+        self.model = model
+        self.columns = {model._meta.pk.name}
+        self.load_all = False
+        self.select_related = set()
+        self.prefetches = {}
+
+    def apply(self, queryset):
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        if self.prefetches:
+            queryset = queryset.prefetch_related(*self.prefetches.values())
+        if not self.load_all:
+            queryset = queryset.only(*sorted(self.columns))
+        return queryset
+
+
+def _add_path(plan, path):
+    """Add an ORM path (``vendor__company_name``) read by a field to the plan."""
+    model = plan.model
+    parts = path.split('__')
+    for depth, part in enumerate(parts):
+        prefix = '__'.join(parts[:depth + 1])
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            # A property or method: fall back to loading every column
+            if depth == 0:
+                plan.load_all = True
+            return
+        if field.many_to_many or field.one_to_many:
+            plan.prefetches.setdefault(prefix, prefix)
+            return
+        if not field.is_relation:
+            plan.columns.add(prefix)
+            return
+        if field.concrete:
+            plan.columns.add(prefix)
+        if depth == len(parts) - 1:
+            return
+        plan.select_related.add(prefix)
+        model = field.related_model
+
+
+def _add_nested(plan, name, field, serializer):
+    source = '__'.join(field.source_attrs)
+    try:
+        relation = plan.model._meta.get_field(source)
+    except FieldDoesNotExist:
+        plan.load_all = True
+        return
+    nested = build_query_plan(serializer, relation.related_model)
+
+    if relation.many_to_many or relation.one_to_many:
+        if relation.one_to_many:
+            # Prefetching matches rows back to their parent on this column
+            nested.columns.add(relation.field.name)
+        plan.prefetches[source] = Prefetch(
+            source, queryset=nested.apply(relation.related_model._default_manager.all())
+        )
+        return
+
+    if relation.concrete:
+        plan.columns.add(source)
+    plan.select_related.add(source)
+    plan.select_related.update(f'{source}__{path}' for path in nested.select_related)
+    if nested.load_all:
+        plan.columns.update(
+            f'{source}__{f.name}' for f in relation.related_model._meta.concrete_fields
+        )
+    else:
+        plan.columns.update(f'{source}__{column}' for column in nested.columns)
+    for path, prefetch in nested.prefetches.items():
+        plan.prefetches[f'{source}__{path}'] = f'{source}__{path}'
+
+
+def build_query_plan(serializer, model):
+    """Work out what ``serializer`` (already trimmed) reads from ``model``."""
+    plan = QueryPlan(model)
+    sources = getattr(getattr(serializer, 'Meta', None), 'field_sources', {})
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in sources:
+            for path in sources[name]:
+                _add_path(plan, path)
+            continue
+
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if isinstance(nested, serializers.ModelSerializer):
+            _add_nested(plan, name, field, nested)
+        elif field.source == '*' or isinstance(field, serializers.SerializerMethodField):
+            plan.load_all = True
+        else:
+            _add_path(plan, '__'.join(field.source_attrs))
+    return plan
+
+
+class SparseQuerysetMixin:
+    """View mixin narrowing the queryset to what a sparse response needs.
+
+    Only applies to reads that pass ``?fields=`` or ``?expand=``; other
+    requests use the view's own queryset untouched.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not isinstance(queryset, QuerySet) or get_sparse_spec(self.request) is None:
+            return queryset
+        plan = build_query_plan(self.get_serializer(), queryset.model)
+        return plan.apply(queryset)
@@ -0,0 +1,95 @@
+import base64
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class StandardPagination(PageNumberPagination):
+    """Page-number pagination for list endpoints (``?page=`` and ``?page_size=``)."""
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+
+
+class KeysetPagination(BasePagination):
+    """Newest-first keyset pagination on a ``(timestamp, id)`` pair.
+
+    Each page is fetched with an index-friendly ``WHERE (ts, id) < cursor``
+    condition instead of an OFFSET, so deep pages cost the same as the
+    first one. Views can set ``keyset_field`` to paginate on a timestamp
+    other than ``created_at``.
+    """
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    keyset_field = 'created_at'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.field = getattr(view, 'keyset_field', self.keyset_field)
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(f'-{self.field}', '-id')
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            timestamp, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__lt': timestamp}) |
+                Q(**{self.field: timestamp, 'id__lt': pk})
+            )
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.last = rows[-1] if rows else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def encode_cursor(self, row):
+        timestamp = getattr(row, self.field).isoformat()
+        return base64.urlsafe_b64encode(f'{timestamp}|{row.pk}'.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            timestamp, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            timestamp = parse_datetime(timestamp)
+            pk = int(pk)
+        except (ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if timestamp is None:
+            raise NotFound(self.invalid_cursor_message)
+        return timestamp, pk
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -140,7 +140,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -181,13 +181,47 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'USER_AUTHENTICATION_RULE': 'rest_framework_simplejwt.authentication.default_user_authentication_rule',
     
-    'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+    'AUTH_TOKEN_CLASSES': ('users.tokens.PortalAccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
     'TOKEN_USER_CLASS': 'rest_framework_simplejwt.models.TokenUser',
     
     'JTI_CLAIM': 'jti',
     
+    # Tokens carry role, department and vendor_id claims (see users.tokens)
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.PortalTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.PortalTokenRefreshSerializer',
+    
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(hours=1),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
-}
\ No newline at end of file
+}
+
+# Cache used for dashboard snapshots and other derived data.
+# Point this at a shared backend (e.g. Redis) when running several workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Dashboard settings
+DASHBOARD_SNAPSHOT_TTL = 60  # seconds a summary snapshot may be served for
+REPORT_JOB_WORKERS = 2  # threads per process running background reports
+REPORT_CACHE_SIZE = 128  # report results kept per process (LRU)
+REPORT_CACHE_TTL = 60  # seconds a cached report may be served for
+DASHBOARD_SECTION_WORKERS = 4  # threads per process building summary sections for the async endpoint
+DASHBOARD_SECTION_TIMEOUT = 5  # seconds before a slow section is reported as timed out
+
+# Notification delivery
+NOTIFICATION_STREAM_HEARTBEAT = 15  # seconds between keep-alives / re-checks on the SSE stream
+NOTIFICATION_POLL_TIMEOUT = 25  # longest a long-poll request is held open
+
+# Per-user dashboard settings cache
+DASHBOARD_SETTINGS_CACHE_SIZE = 1024  # users kept in the process-local LRU
+DASHBOARD_SETTINGS_CACHE_TTL = 60  # seconds before a local entry is re-read from the shared cache
+
+# Document numbers
+DOCUMENT_NUMBER_BLOCK_SIZE = 20  # sequence values each process reserves at a time (unused ones become gaps)
+
+# Approval rules
+APPROVAL_RULES_CHECK_INTERVAL = 5  # seconds between checks for rules changed by other processes
@@ -1,17 +1,19 @@
 from rest_framework import serializers
+from eprocurement_portal.fieldsets import SparseFieldsMixin
 from .models import Category, InventoryItem, InventoryTransaction
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     subcategory_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Category
         fields = ('id', 'name', 'description', 'parent', 'subcategory_count')
+        field_sources = {'subcategory_count': ()}
         
     def get_subcategory_count(self, obj):
         return obj.subcategories.count()
 
-class InventoryItemSerializer(serializers.ModelSerializer):
+class InventoryItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     needs_reorder = serializers.BooleanField(read_only=True)
     total_value = serializers.DecimalField(
@@ -25,8 +27,12 @@ class InventoryItemSerializer(serializers.ModelSerializer):
                 'unit_price', 'location', 'last_ordered_date', 'is_active',
                 'created_at', 'updated_at', 'needs_reorder', 'total_value')
         read_only_fields = ('created_at', 'updated_at')
+        field_sources = {
+            'needs_reorder': ('current_quantity', 'minimum_quantity'),
+            'total_value': ('current_quantity', 'unit_price'),
+        }
 
-class InventoryTransactionSerializer(serializers.ModelSerializer):
+class InventoryTransactionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     item_name = serializers.CharField(source='item.name', read_only=True)
     created_by_name = serializers.CharField(source='created_by.username', read_only=True)
     
@@ -2,6 +2,7 @@ from rest_framework import generics, status, filters
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
+from eprocurement_portal.fieldsets import SparseQuerysetMixin
 from django.shortcuts import get_object_or_404
 from django.db.models import F, Q
 from .models import Category, InventoryItem, InventoryTransaction
@@ -10,7 +11,7 @@ from .serializers import (
 )
 from users.permissions import IsProcurementOfficer
 
-class CategoryListView(generics.ListCreateAPIView):
+class CategoryListView(SparseQuerysetMixin, generics.ListCreateAPIView):
     """API endpoint for listing and creating inventory categories."""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
@@ -23,13 +24,13 @@ class CategoryListView(generics.ListCreateAPIView):
             self.permission_classes = [IsAuthenticated, IsProcurementOfficer]
         return super().get_permissions()
 
-class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CategoryDetailView(SparseQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     """API endpoint for managing a specific inventory category."""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated, IsProcurementOfficer]
 
-class InventoryItemListView(generics.ListCreateAPIView):
+class InventoryItemListView(SparseQuerysetMixin, generics.ListCreateAPIView):
     """API endpoint for listing and creating inventory items."""
     serializer_class = InventoryItemSerializer
     permission_classes = [IsAuthenticated]
@@ -71,13 +72,13 @@ class InventoryItemListView(generics.ListCreateAPIView):
             
         return queryset
 
-class InventoryItemDetailView(generics.RetrieveUpdateDestroyAPIView):
+class InventoryItemDetailView(SparseQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     """API endpoint for managing a specific inventory item."""
     queryset = InventoryItem.objects.all()
     serializer_class = InventoryItemSerializer
     permission_classes = [IsAuthenticated, IsProcurementOfficer]
 
-class InventoryTransactionView(generics.ListCreateAPIView):
+class InventoryTransactionView(SparseQuerysetMixin, generics.ListCreateAPIView):
     """API endpoint for listing and creating inventory transactions."""
     serializer_class = InventoryTransactionSerializer
     permission_classes = [IsAuthenticated, IsProcurementOfficer]
@@ -91,7 +92,7 @@ class InventoryTransactionView(generics.ListCreateAPIView):
         item = get_object_or_404(InventoryItem, id=item_id)
         serializer.save(item=item, created_by=self.request.user)
 
-class LowStockItemsView(generics.ListAPIView):
+class LowStockItemsView(SparseQuerysetMixin, generics.ListAPIView):
     """API endpoint for listing items with low stock levels."""
     serializer_class = InventoryItemSerializer
     permission_classes = [IsAuthenticated]
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import PurchaseOrder, PurchaseOrderItem, Shipment, ShipmentItem
+from .models import PurchaseOrder, PurchaseOrderItem, Shipment, ShipmentItem, DailySpend, DocumentSequence
 
 class PurchaseOrderItemInline(admin.TabularInline):
     model = PurchaseOrderItem
@@ -57,4 +57,16 @@ class ShipmentAdmin(admin.ModelAdmin):
 class ShipmentItemAdmin(admin.ModelAdmin):
     list_display = ('shipment', 'purchase_order_item', 'quantity_shipped', 'quantity_received')
     list_filter = ('shipment__is_complete',)
-    search_fields = ('shipment__tracking_number', 'purchase_order_item__item_name')
\ No newline at end of file
+    search_fields = ('shipment__tracking_number', 'purchase_order_item__item_name')
+
+@admin.register(DailySpend)
+class DailySpendAdmin(admin.ModelAdmin):
+    list_display = ('date', 'order_count', 'total')
+    date_hierarchy = 'date'
+    readonly_fields = ('date', 'order_count', 'total')
+
+@admin.register(DocumentSequence)
+class DocumentSequenceAdmin(admin.ModelAdmin):
+    list_display = ('prefix', 'period', 'last_value')
+    list_filter = ('prefix',)
+    readonly_fields = ('prefix', 'period', 'last_value')
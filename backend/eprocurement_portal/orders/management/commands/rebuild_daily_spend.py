@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from orders.models import DailySpend
+from orders.spend import rebuild_daily_spend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the DailySpend rollup from purchase orders.'
+
+    def handle(self, *args, **options):
+        rebuild_daily_spend()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt spend rollup ({DailySpend.objects.count()} days).'
+        ))
@@ -0,0 +1,78 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Abs, Coalesce
+
+from dashboard.caching import bump_data_version
+from orders.models import PurchaseOrder, PurchaseOrderItem
+from orders.spend import rebuild_daily_spend
+from requisitions.models import Requisition, RequisitionItem
+
+# Differences below half a cent are rounding, not drift
+TOLERANCE = Decimal('0.005')
+
+
+def item_sum(model, parent_field, amount_field):
+    """Subquery summing ``amount_field`` over the items of the outer row."""
+    totals = model.objects.filter(**{parent_field: OuterRef('pk')}).order_by().values(
+        parent_field
+    ).annotate(total=Sum(amount_field)).values('total')
+    return Coalesce(
+        Subquery(totals), Value(Decimal('0')),
+        output_field=DecimalField(max_digits=12, decimal_places=2)
+    )
+
+
+class Command(BaseCommand):
+    help = 'Check purchase order and requisition totals against their line items.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', action='store_true',
+            help='Recompute the totals of every order and requisition that has drifted.'
+        )
+
+    def handle(self, *args, **options):
+        order_total = item_sum(PurchaseOrderItem, 'purchase_order', 'total_price')
+        grand_total = order_total + F('tax_amount') + F('shipping_cost') - F('discount_amount')
+        drifted_orders = PurchaseOrder.objects.annotate(
+            total_drift=Abs(F('total_amount') - order_total),
+            grand_total_drift=Abs(F('grand_total') - grand_total),
+        ).filter(Q(total_drift__gt=TOLERANCE) | Q(grand_total_drift__gt=TOLERANCE))
+
+        requisition_total = item_sum(RequisitionItem, 'requisition', 'estimated_cost')
+        drifted_requisitions = Requisition.objects.annotate(
+            total_drift=Abs(F('total_estimated_cost') - requisition_total),
+        ).filter(total_drift__gt=TOLERANCE)
+
+        order_count = drifted_orders.count()
+        requisition_count = drifted_requisitions.count()
+        self.stdout.write(
+            f'{order_count} purchase order(s) and {requisition_count} requisition(s) '
+            f'have totals that do not match their items.'
+        )
+        if not options['fix'] or not (order_count or requisition_count):
+            return
+
+        with transaction.atomic():
+            # Each repair is one UPDATE over the drifted rows
+            if order_count:
+                PurchaseOrder.objects.filter(pk__in=drifted_orders.values('pk')).update(
+                    total_amount=order_total,
+                    grand_total=grand_total,
+                )
+                # Spend follows grand totals, which the UPDATE bypassed
+                rebuild_daily_spend()
+            if requisition_count:
+                Requisition.objects.filter(pk__in=drifted_requisitions.values('pk')).update(
+                    total_estimated_cost=requisition_total,
+                )
+            transaction.on_commit(lambda: bump_data_version(
+                'orders.PurchaseOrder', 'requisitions.Requisition'
+            ))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Fixed {order_count} purchase order(s) and {requisition_count} requisition(s).'
+        ))
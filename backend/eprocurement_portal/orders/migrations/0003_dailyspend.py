@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:26
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_spend(apps, schema_editor):
+    PurchaseOrder = apps.get_model('orders', 'PurchaseOrder')
+    DailySpend = apps.get_model('orders', 'DailySpend')
+    rows = PurchaseOrder.objects.filter(
+        status__in=['partial', 'complete']
+    ).annotate(day=TruncDate('date_created')).values('day').annotate(
+        order_count=Count('id'),
+        total=Sum('grand_total')
+    ).order_by()
+    DailySpend.objects.bulk_create([
+        DailySpend(date=row['day'], order_count=row['order_count'], total=row['total'])
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySpend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('order_count', models.IntegerField(default=0)),
+                ('total', models.DecimalField(decimal_places=2, default=0.0, max_digits=14)),
+            ],
+            options={
+                'verbose_name': 'Daily Spend',
+                'verbose_name_plural': 'Daily Spend',
+                'ordering': ['date'],
+            },
+        ),
+        migrations.RunPython(backfill_daily_spend, migrations.RunPython.noop),
+    ]
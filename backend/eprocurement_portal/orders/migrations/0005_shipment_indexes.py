@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_documentsequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='shipment',
+            index=models.Index(fields=['is_complete', 'expected_arrival_date'], name='shipment_complete_arrival_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shipment',
+            index=models.Index(fields=['expected_arrival_date'], name='shipment_arrival_idx'),
+        ),
+    ]
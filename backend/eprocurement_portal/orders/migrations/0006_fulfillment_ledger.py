@@ -0,0 +1,62 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:44
+
+from django.db import migrations, models
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+
+def backfill_fulfillment_ledger(apps, schema_editor):
+    PurchaseOrder = apps.get_model('orders', 'PurchaseOrder')
+    PurchaseOrderItem = apps.get_model('orders', 'PurchaseOrderItem')
+    ShipmentItem = apps.get_model('orders', 'ShipmentItem')
+
+    received = ShipmentItem.objects.filter(
+        purchase_order_item=OuterRef('pk')
+    ).order_by().values('purchase_order_item').annotate(
+        total=Sum('quantity_received')
+    ).values('total')
+    PurchaseOrderItem.objects.update(
+        quantity_received=Coalesce(Subquery(received), Value(0), output_field=IntegerField())
+    )
+    PurchaseOrderItem.objects.update(quantity_outstanding=Case(
+        When(quantity__gt=F('quantity_received'), then=F('quantity') - F('quantity_received')),
+        default=Value(0),
+        output_field=IntegerField()
+    ))
+
+    open_lines = PurchaseOrderItem.objects.filter(
+        purchase_order=OuterRef('pk'), quantity_outstanding__gt=0
+    ).order_by().values('purchase_order').annotate(count=Count('id')).values('count')
+    PurchaseOrder.objects.update(
+        open_line_count=Coalesce(Subquery(open_lines), Value(0), output_field=IntegerField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_shipment_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='open_line_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='purchaseorderitem',
+            name='quantity_outstanding',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='purchaseorderitem',
+            name='quantity_received',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorderitem',
+            index=models.Index(condition=models.Q(('quantity_outstanding__gt', 0)), fields=['purchase_order', 'id'], name='po_item_open_idx'),
+        ),
+        migrations.RunPython(backfill_fulfillment_ledger, migrations.RunPython.noop),
+    ]
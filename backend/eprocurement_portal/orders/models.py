@@ -1,6 +1,11 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Coalesce
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
+from django.utils import timezone
 
 class PurchaseOrder(models.Model):
     STATUS_CHOICES = [
@@ -12,6 +17,15 @@ class PurchaseOrder(models.Model):
         ('cancelled', _('Cancelled')),
     ]
     
+    # Orders in these states count towards spend (see DailySpend)
+    SPEND_STATUSES = ('partial', 'complete')
+    # Receipts never move an order out of these states
+    TERMINAL_STATUSES = ('cancelled',)
+    # Charges entered on the order itself; grand_total follows from them
+    CHARGE_FIELDS = ('tax_amount', 'shipping_cost', 'discount_amount')
+    # Maintained with F() updates from items and receipts
+    MAINTAINED_FIELDS = ('total_amount', 'grand_total', 'open_line_count')
+    
     po_number = models.CharField(max_length=50, unique=True)
     vendor = models.ForeignKey(
         'vendors.Vendor',
@@ -35,6 +49,8 @@ class PurchaseOrder(models.Model):
     shipping_cost = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     discount_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     grand_total = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
+    # Lines still waiting for goods, maintained from items and receipts
+    open_line_count = models.PositiveIntegerField(default=0)
     
     class Meta:
         verbose_name = _("Purchase Order")
@@ -44,18 +60,130 @@ class PurchaseOrder(models.Model):
     def __str__(self):
         return f"PO-{self.po_number}"
     
+    def save(self, *args, **kwargs):
+        # A full save of an instance loaded earlier must not write stale
+        # maintained values back over concurrent F() updates
+        if not self._state.adding and kwargs.get('update_fields') is None and len(args) < 4:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                f.attname for f in self._meta.concrete_fields
+                if not f.primary_key and f.attname not in deferred
+                and f.name not in self.MAINTAINED_FIELDS
+            ]
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic():
+            if self._state.adding:
+                self.set_totals(self.total_amount)
+            elif len(args) < 4 and self.charges_changed() and (
+                set(update_fields) & set(self.CHARGE_FIELDS)
+            ):
+                # The line total moves with concurrent item writes, so derive
+                # the grand total from the stored one while the row is locked.
+                self.set_totals(PurchaseOrder.objects.select_for_update().values_list(
+                    'total_amount', flat=True
+                ).get(pk=self.pk))
+                kwargs['update_fields'] = {*update_fields, 'total_amount', 'grand_total'}
+            super().save(*args, **kwargs)
+        self._loaded_charges = self.charges()
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what this order contributed to spend when it was loaded,
+        # so saves can apply only the difference to the rollup.
+        if {'status', 'grand_total', 'date_created'}.issubset(field_names):
+            instance._loaded_spend = instance.spend_contribution()
+        if set(cls.CHARGE_FIELDS).issubset(field_names):
+            instance._loaded_charges = instance.charges()
+        return instance
+    
+    def charges(self):
+        return tuple(Decimal(str(getattr(self, field))) for field in self.CHARGE_FIELDS)
+    
+    def charges_changed(self):
+        """Whether tax, shipping or discount differ from when this order was loaded."""
+        return getattr(self, '_loaded_charges', None) != self.charges()
+    
+    def spend_contribution(self):
+        """Return ``(date, amount)`` counted towards spend, or None."""
+        if self.status not in self.SPEND_STATUSES or self.date_created is None:
+            return None
+        return (timezone.localdate(self.date_created), self.grand_total)
+    
     def calculate_totals(self):
-        # Calculate the sum of all line items
-        total = 0
-        for item in self.items.all():
-            total += item.total_price
-        self.total_amount = total
+        # Recompute the sum of all line items in the database
+        total = self.items.aggregate(total=Coalesce(Sum('total_price'), Decimal('0')))['total']
+        self.set_totals(total)
+        self.save(update_fields=['total_amount', 'grand_total'])
+    
+    def adjust_totals(self, delta, open_lines=0):
+        """Apply a change in line item totals with a single UPDATE.
+        
+        Line items call this when they are created, changed or deleted, so
+        keeping the totals (and the count of open lines) current costs the
+        same however many lines the order has. This instance is updated in
+        memory to match.
+        """
+        if not delta and not open_lines:
+            return
+        # The grand total is derived from the stored charges, not shifted,
+        # so edits to tax, shipping or discount are never lost.
+        PurchaseOrder.objects.filter(pk=self.pk).update(
+            total_amount=F('total_amount') + delta,
+            grand_total=(
+                F('total_amount') + delta + F('tax_amount') + F('shipping_cost') - F('discount_amount')
+            ),
+            open_line_count=F('open_line_count') + open_lines
+        )
+        self.set_totals(Decimal(str(self.total_amount)) + delta)
+        self.open_line_count += open_lines
+        if not delta:
+            return
+        
+        # The UPDATE sends no signals, so move the spend rollup here
+        contribution = self.spend_contribution()
+        if contribution is not None:
+            from .spend import add_spend
+            add_spend(contribution[0], 0, delta)
+            self._loaded_spend = contribution
+    
+    def derive_status(self):
+        """Return the status receipts put this order in, from its open line count."""
+        if self.status in self.TERMINAL_STATUSES:
+            return self.status
+        return 'complete' if self.open_line_count == 0 else 'partial'
+    
+    def set_totals(self, total_amount):
+        # Unsaved orders may still hold the float field defaults
+        self.total_amount, self.tax_amount, self.shipping_cost, self.discount_amount = (
+            Decimal(str(amount)) for amount in (
+                total_amount, self.tax_amount, self.shipping_cost, self.discount_amount
+            )
+        )
         
         # Calculate grand total with tax, shipping, and discount
         self.grand_total = (
             self.total_amount + self.tax_amount + self.shipping_cost - self.discount_amount
         )
-        self.save()
+    
+    def add_items(self, items_data):
+        """Create line items in bulk and update the order totals once.
+        
+        Unlike saving items one by one, this inserts all of them with a
+        single query and adjusts the order's totals with a single UPDATE.
+        Call it inside a transaction.
+        """
+        items = [PurchaseOrderItem(**{**item_data, 'purchase_order': self}) for item_data in items_data]
+        for item in items:
+            item.total_price = item.quantity * item.unit_price
+            item.quantity_outstanding = max(item.quantity - item.quantity_received, 0)
+        PurchaseOrderItem.objects.bulk_create(items)
+        
+        self.adjust_totals(
+            sum(item.total_price for item in items),
+            sum(1 for item in items if item.quantity_outstanding)
+        )
+        return items
 
 class PurchaseOrderItem(models.Model):
     purchase_order = models.ForeignKey(
@@ -70,6 +198,10 @@ class PurchaseOrderItem(models.Model):
     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
     total_price = models.DecimalField(max_digits=12, decimal_places=2)
     
+    # Fulfillment ledger, maintained on receipt
+    quantity_received = models.PositiveIntegerField(default=0)
+    quantity_outstanding = models.PositiveIntegerField(default=0)
+    
     # Optional link to inventory item if exists
     inventory_item = models.ForeignKey(
         'inventory.InventoryItem',
@@ -88,15 +220,96 @@ class PurchaseOrderItem(models.Model):
         related_name='purchase_order_items'
     )
     
+    class Meta:
+        indexes = [
+            # Open receipts: only lines still waiting for goods are indexed
+            models.Index(
+                fields=['purchase_order', 'id'],
+                name='po_item_open_idx',
+                condition=models.Q(quantity_outstanding__gt=0)
+            ),
+        ]
+    
     def __str__(self):
         return f"{self.item_name} - {self.quantity} {self.unit_of_measure}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what this line added to its order's totals when loaded
+        if {'purchase_order_id', 'total_price', 'quantity_outstanding'}.issubset(field_names):
+            instance._loaded_line = instance.line_state()
+        return instance
+    
+    def line_state(self):
+        """Return ``(purchase_order_id, total_price, is_open)`` for this line."""
+        return (self.purchase_order_id, self.total_price, self.quantity_outstanding > 0)
+    
+    def previous_line(self):
+        """Return ``line_state()`` as last saved, or None for a new line."""
+        if self.pk is None:
+            return None
+        if not hasattr(self, '_loaded_line'):
+            previous = PurchaseOrderItem.objects.filter(pk=self.pk).values_list(
+                'purchase_order_id', 'total_price', 'quantity_outstanding'
+            ).first()
+            self._loaded_line = previous and (previous[0], previous[1], previous[2] > 0)
+        return self._loaded_line
+    
     def save(self, *args, **kwargs):
         self.total_price = self.quantity * self.unit_price
+        self.quantity_outstanding = max(self.quantity - self.quantity_received, 0)
+        previous = self.previous_line()
         super().save(*args, **kwargs)
-        # Update the PO total
-        if self.purchase_order:
-            self.purchase_order.calculate_totals()
+        self._loaded_line = self.line_state()
+        
+        # Update the PO totals by the difference
+        if previous is not None and previous[0] != self.purchase_order_id:
+            PurchaseOrder.objects.get(pk=previous[0]).adjust_totals(-previous[1], -int(previous[2]))
+            previous = None
+        if previous is None:
+            previous = (self.purchase_order_id, 0, False)
+        self.purchase_order.adjust_totals(
+            self.total_price - previous[1],
+            int(self._loaded_line[2]) - int(previous[2])
+        )
+
+class DailySpend(models.Model):
+    """Per-day rollup of purchase order spend.
+
+    Maintained from PurchaseOrder saves: an order counts on the day it was
+    created once it reaches one of ``PurchaseOrder.SPEND_STATUSES``.
+    """
+    date = models.DateField(unique=True)
+    order_count = models.IntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0.00)
+    
+    class Meta:
+        verbose_name = _("Daily Spend")
+        verbose_name_plural = _("Daily Spend")
+        ordering = ['date']
+    
+    def __str__(self):
+        return f"{self.date} - {self.total}"
+
+class DocumentSequence(models.Model):
+    """Counter behind generated document numbers, one per prefix and period.
+    
+    Worker processes reserve blocks of values from it (see
+    ``orders.sequences``), so ``last_value`` is the highest value handed
+    out to any process, not necessarily the highest one in use.
+    """
+    prefix = models.CharField(max_length=20)
+    period = models.CharField(max_length=20)
+    last_value = models.PositiveBigIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = _("Document Sequence")
+        verbose_name_plural = _("Document Sequences")
+        unique_together = ['prefix', 'period']
+    
+    def __str__(self):
+        return f"{self.prefix}-{self.period}: {self.last_value}"
 
 class Shipment(models.Model):
     purchase_order = models.ForeignKey(
@@ -118,6 +331,13 @@ class Shipment(models.Model):
     notes = models.TextField(blank=True)
     is_complete = models.BooleanField(default=False)
     
+    class Meta:
+        indexes = [
+            # Open/complete shipments by arrival date, and arrival date ranges
+            models.Index(fields=['is_complete', 'expected_arrival_date'], name='shipment_complete_arrival_idx'),
+            models.Index(fields=['expected_arrival_date'], name='shipment_arrival_idx'),
+        ]
+    
     def __str__(self):
         return f"Shipment for {self.purchase_order} - {self.tracking_number}"
 
@@ -0,0 +1,172 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from dashboard.caching import bump_data_version
+from inventory.models import InventoryItem, InventoryTransaction
+from requisitions.models import RequisitionStatus
+from .models import PurchaseOrder, PurchaseOrderItem, Shipment, ShipmentItem
+
+
+def _parse_receipts(received_items):
+    """Map shipment item ids to ``(quantity_received, condition_notes)``."""
+    receipts = {}
+    for item_data in received_items:
+        shipment_item_id = item_data.get('shipment_item_id')
+        quantity_received = item_data.get('quantity_received', 0)
+
+        if not shipment_item_id or not quantity_received:
+            continue
+        try:
+            receipts[int(shipment_item_id)] = (
+                int(quantity_received), item_data.get('condition_notes', '')
+            )
+        except (TypeError, ValueError):
+            continue
+    return receipts
+
+
+@transaction.atomic
+def receive_shipment(shipment_id, received_items, user):
+    """Record received quantities for a shipment and book them into inventory.
+
+    Works in batches whatever the size of the shipment: the shipment items
+    are read in one query and written with ``bulk_update``, each inventory
+    item gets one ``F()`` increment covering all of its lines, and the
+    ledger rows are inserted with ``bulk_create``. The order lines'
+    received and outstanding quantities are updated in the same
+    transaction, and the order's status is derived from its open line count.
+    """
+    receipts = _parse_receipts(received_items)
+
+    shipment = Shipment.objects.select_for_update().get(pk=shipment_id)
+    # Lock the order too: item writes adjust its open line count, and the
+    # status is derived from it below
+    purchase_order = PurchaseOrder.objects.select_for_update().get(pk=shipment.purchase_order_id)
+    shipment.purchase_order = purchase_order
+
+    # Mark current date as actual arrival
+    if not shipment.actual_arrival_date:
+        shipment.actual_arrival_date = timezone.now().date()
+
+    # Mark the user who received the shipment
+    shipment.received_by = user
+
+    shipment_items = list(
+        ShipmentItem.objects.filter(shipment=shipment, id__in=receipts).select_related(
+            'purchase_order_item'
+        )
+    )
+
+    receipt_lines = []
+    ledger_changes = defaultdict(int)
+    for shipment_item in shipment_items:
+        quantity_received, condition_notes = receipts[shipment_item.id]
+
+        # Update received quantity
+        previous_qty = shipment_item.quantity_received
+        shipment_item.quantity_received = min(quantity_received, shipment_item.quantity_shipped)
+        shipment_item.condition_notes = condition_notes
+
+        qty_change = shipment_item.quantity_received - previous_qty
+        po_item = shipment_item.purchase_order_item
+        if qty_change:
+            ledger_changes[po_item.id] += qty_change
+        if qty_change > 0 and po_item.inventory_item_id:
+            receipt_lines.append((po_item.inventory_item_id, qty_change, po_item.unit_price))
+
+    ShipmentItem.objects.bulk_update(
+        shipment_items, ['quantity_received', 'condition_notes'], batch_size=500
+    )
+
+    if receipt_lines:
+        _book_receipts(receipt_lines, user, f"PO-{purchase_order.po_number}")
+
+    # The shipment is complete once every one of its items is fully received
+    shipment.is_complete = not ShipmentItem.objects.filter(
+        shipment=shipment, quantity_received__lt=F('quantity_shipped')
+    ).exists()
+
+    if ledger_changes:
+        # The order row is locked, so its open line count is current and
+        # the status follows from it directly.
+        purchase_order.adjust_totals(0, _update_ledger(ledger_changes))
+        purchase_order.status = purchase_order.derive_status()
+        purchase_order.save(update_fields=['status'])
+
+        if purchase_order.status == 'complete':
+            # If this PO was from a requisition, mark it as completed
+            requisition = getattr(purchase_order, 'requisition', None)
+            if requisition:
+                requisition.status = RequisitionStatus.COMPLETED
+                requisition.save()
+
+    shipment.save()
+    return shipment
+
+
+def _update_ledger(changes):
+    """Apply received quantity changes to order lines; return the change in open lines."""
+    lines = list(
+        PurchaseOrderItem.objects.select_for_update().filter(pk__in=changes).only(
+            'quantity', 'quantity_received', 'quantity_outstanding'
+        )
+    )
+    open_lines = 0
+    for line in lines:
+        was_open = line.quantity_outstanding > 0
+        line.quantity_received = max(line.quantity_received + changes[line.pk], 0)
+        line.quantity_outstanding = max(line.quantity - line.quantity_received, 0)
+        open_lines += int(line.quantity_outstanding > 0) - int(was_open)
+
+    PurchaseOrderItem.objects.bulk_update(
+        lines, ['quantity_received', 'quantity_outstanding'], batch_size=500
+    )
+    return open_lines
+
+
+def _book_receipts(receipt_lines, user, reference):
+    """Add received quantities to inventory and write one ledger row per line."""
+    increments = defaultdict(int)
+    for item_id, quantity, _ in receipt_lines:
+        increments[item_id] += quantity
+
+    # Lock the items so the ledger's running quantities match the stock
+    quantities = dict(
+        InventoryItem.objects.select_for_update().filter(pk__in=increments).values_list(
+            'pk', 'current_quantity'
+        )
+    )
+
+    InventoryItem.objects.filter(pk__in=quantities).update(
+        current_quantity=F('current_quantity') + Case(
+            *[When(pk=item_id, then=Value(increments[item_id])) for item_id in quantities],
+            output_field=IntegerField()
+        ),
+        updated_at=timezone.now()
+    )
+
+    transactions = []
+    for item_id, quantity, unit_price in receipt_lines:
+        if item_id not in quantities:
+            continue
+        previous_quantity = quantities[item_id]
+        quantities[item_id] += quantity
+        transactions.append(InventoryTransaction(
+            item_id=item_id,
+            transaction_type='receipt',
+            quantity=quantity,
+            previous_quantity=previous_quantity,
+            new_quantity=quantities[item_id],
+            unit_price=unit_price,
+            created_by=user,
+            reference=reference
+        ))
+    InventoryTransaction.objects.bulk_create(transactions, batch_size=500)
+
+    # Bulk writes send no signals, so invalidate the dashboard here
+    transaction.on_commit(lambda: bump_data_version(
+        'inventory.InventoryItem', 'inventory.InventoryTransaction'
+    ))
@@ -0,0 +1,72 @@
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DocumentSequence
+
+
+def _reserve(prefix, period, size):
+    """Advance the counter by ``size`` and return the last value reserved."""
+    sequence = DocumentSequence.objects.filter(prefix=prefix, period=period)
+    if not sequence.update(last_value=F('last_value') + size):
+        try:
+            with transaction.atomic():
+                DocumentSequence.objects.create(prefix=prefix, period=period, last_value=size)
+            return size
+        except IntegrityError:
+            # Another process created the counter in the meantime
+            sequence.update(last_value=F('last_value') + size)
+    return sequence.values_list('last_value', flat=True).get()
+
+
+class BlockAllocator:
+    """Hands out sequence values from blocks reserved in ``DocumentSequence``.
+    
+    Each process reserves ``block_size`` values at a time with a single
+    UPDATE and serves them from memory, so processes never hand out the
+    same value. Values left in a block when a process exits are skipped,
+    so sequences may have gaps.
+    """
+    
+    def __init__(self, block_size):
+        self.block_size = block_size
+        self._blocks = {}
+        self._lock = threading.Lock()
+    
+    def next_value(self, prefix, period):
+        # A block reserved inside the caller's transaction would be rolled
+        # back with it and handed out again elsewhere, so reserve single
+        # values there instead and keep them part of that transaction.
+        if transaction.get_connection().in_atomic_block:
+            return _reserve(prefix, period, 1)
+        
+        key = (prefix, period)
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is None or block[0] > block[1]:
+                with transaction.atomic():
+                    last = _reserve(prefix, period, self.block_size)
+                block = self._blocks[key] = [last - self.block_size + 1, last]
+            value = block[0]
+            block[0] += 1
+        return value
+    
+    def reset(self):
+        with self._lock:
+            self._blocks.clear()
+
+
+allocator = BlockAllocator(getattr(settings, 'DOCUMENT_NUMBER_BLOCK_SIZE', 20))
+
+
+def next_po_number():
+    """Return a new purchase order number, e.g. ``PO-202406-00042``.
+    
+    Numbers are zero-padded to five digits so they cannot collide with
+    the older randomly generated four-digit ones.
+    """
+    period = timezone.localdate().strftime('%Y%m')
+    return f"PO-{period}-{allocator.next_value('PO', period):05d}"
@@ -1,17 +1,18 @@
-from django.utils import timezone
-import random
+from django.db import transaction
 from rest_framework import serializers
+from eprocurement_portal.fieldsets import SparseFieldsMixin
 from .models import PurchaseOrder, PurchaseOrderItem, Shipment, ShipmentItem
+from .sequences import next_po_number
 
-class PurchaseOrderItemSerializer(serializers.ModelSerializer):
+class PurchaseOrderItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = PurchaseOrderItem
         fields = ('id', 'purchase_order', 'item_name', 'description', 'quantity', 
                   'unit_of_measure', 'unit_price', 'total_price', 'inventory_item', 
-                  'requisition_item')
-        read_only_fields = ('total_price',)
+                  'requisition_item', 'quantity_received', 'quantity_outstanding')
+        read_only_fields = ('total_price', 'quantity_received', 'quantity_outstanding')
 
-class PurchaseOrderSerializer(serializers.ModelSerializer):
+class PurchaseOrderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     items = PurchaseOrderItemSerializer(many=True, read_only=True)
     vendor_name = serializers.CharField(source='vendor.company_name', read_only=True)
     created_by_name = serializers.CharField(source='created_by.username', read_only=True)
@@ -22,12 +23,30 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
                   'created_by_name', 'date_created', 'expected_delivery_date', 
                   'shipping_address', 'billing_address', 'status', 'notes', 
                   'terms_and_conditions', 'total_amount', 'tax_amount', 
-                  'shipping_cost', 'discount_amount', 'grand_total', 'items')
+                  'shipping_cost', 'discount_amount', 'grand_total', 'open_line_count', 'items')
         read_only_fields = ('po_number', 'date_created', 'created_by', 'created_by_name', 
-                           'total_amount', 'grand_total')
+                           'total_amount', 'grand_total', 'open_line_count')
+        expandable_fields = ('items',)
+
+class PurchaseOrderSummarySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Purchase order without its line items or long text fields, for lists."""
+    vendor_name = serializers.CharField(source='vendor.company_name', read_only=True)
+    created_by_name = serializers.CharField(source='created_by.username', read_only=True)
+    
+    class Meta:
+        model = PurchaseOrder
+        fields = ('id', 'po_number', 'vendor', 'vendor_name', 'created_by', 
+                  'created_by_name', 'date_created', 'expected_delivery_date', 
+                  'status', 'total_amount', 'grand_total')
+        read_only_fields = fields
+
+class PurchaseOrderItemCreateSerializer(PurchaseOrderItemSerializer):
+    """Line item nested in a new purchase order, which it is attached to on create."""
+    class Meta(PurchaseOrderItemSerializer.Meta):
+        read_only_fields = ('purchase_order',) + PurchaseOrderItemSerializer.Meta.read_only_fields
 
 class PurchaseOrderCreateSerializer(serializers.ModelSerializer):
-    items = PurchaseOrderItemSerializer(many=True)
+    items = PurchaseOrderItemCreateSerializer(many=True)
     
     class Meta:
         model = PurchaseOrder
@@ -38,28 +57,38 @@ class PurchaseOrderCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         items_data = validated_data.pop('items')
         
-        # Generate PO number (you can customize this)
-        po_number = f"PO-{timezone.now().strftime('%Y%m')}-{random.randint(1000, 9999)}"
-        
-        # Create the PO
-        purchase_order = PurchaseOrder.objects.create(
-            po_number=po_number,
-            **validated_data
-        )
+        # Allocated before the transaction so numbers come from this process's block
+        po_number = next_po_number()
         
-        # Create the PO items
-        for item_data in items_data:
-            PurchaseOrderItem.objects.create(
-                purchase_order=purchase_order,
-                **item_data
+        with transaction.atomic():
+            # Create the PO
+            purchase_order = PurchaseOrder.objects.create(
+                po_number=po_number,
+                **validated_data
             )
-        
-        # Calculate totals
-        purchase_order.calculate_totals()
+            
+            # Create the PO items and totals in one pass
+            purchase_order.add_items(items_data)
         
         return purchase_order
 
-class ShipmentItemSerializer(serializers.ModelSerializer):
+class OpenReceiptSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Order line still waiting for goods."""
+    po_number = serializers.CharField(source='purchase_order.po_number', read_only=True)
+    vendor = serializers.IntegerField(source='purchase_order.vendor_id', read_only=True)
+    vendor_name = serializers.CharField(source='purchase_order.vendor.company_name', read_only=True)
+    expected_delivery_date = serializers.DateField(
+        source='purchase_order.expected_delivery_date', read_only=True
+    )
+    
+    class Meta:
+        model = PurchaseOrderItem
+        fields = ('id', 'purchase_order', 'po_number', 'vendor', 'vendor_name',
+                  'expected_delivery_date', 'item_name', 'quantity', 'unit_of_measure',
+                  'quantity_received', 'quantity_outstanding', 'inventory_item')
+        read_only_fields = fields
+
+class ShipmentItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     purchase_order_item_details = PurchaseOrderItemSerializer(source='purchase_order_item', read_only=True)
     item_name = serializers.CharField(source='purchase_order_item.item_name', read_only=True)
     
@@ -68,8 +97,9 @@ class ShipmentItemSerializer(serializers.ModelSerializer):
         fields = ('id', 'shipment', 'purchase_order_item', 'purchase_order_item_details', 
                   'item_name', 'quantity_shipped', 'quantity_received', 'condition_notes')
         read_only_fields = ('shipment',)
+        expandable_fields = ('purchase_order_item_details',)
 
-class ShipmentSerializer(serializers.ModelSerializer):
+class ShipmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     items = ShipmentItemSerializer(many=True, read_only=True)
     purchase_order_number = serializers.CharField(source='purchase_order.po_number', read_only=True)
     vendor_name = serializers.CharField(source='purchase_order.vendor.company_name', read_only=True)
@@ -81,4 +111,5 @@ class ShipmentSerializer(serializers.ModelSerializer):
                   'tracking_number', 'carrier', 'expected_arrival_date', 
                   'actual_arrival_date', 'received_by', 'received_by_name', 
                   'notes', 'is_complete', 'items')
-        read_only_fields = ('received_by', 'received_by_name', 'actual_arrival_date', 'is_complete')
\ No newline at end of file
+        read_only_fields = ('received_by', 'received_by_name', 'actual_arrival_date', 'is_complete')
+        expandable_fields = ('items',)
\ No newline at end of file
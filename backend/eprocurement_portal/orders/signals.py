@@ -0,0 +1,40 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from eprocurement_portal.deletion import deleted_directly
+
+from .models import PurchaseOrder, PurchaseOrderItem
+from .spend import apply_spend_change
+
+
+@receiver(pre_save, sender=PurchaseOrder)
+def load_previous_spend(sender, instance, **kwargs):
+    # Instances not loaded through from_db (e.g. built by hand with a pk)
+    # have no recorded contribution yet, so read it once from the database.
+    if instance.pk is None or hasattr(instance, '_loaded_spend'):
+        return
+    previous = sender.objects.filter(pk=instance.pk).first()
+    instance._loaded_spend = previous.spend_contribution() if previous else None
+
+
+@receiver(post_save, sender=PurchaseOrder)
+def update_daily_spend(sender, instance, created, **kwargs):
+    old = None if created else getattr(instance, '_loaded_spend', None)
+    new = instance.spend_contribution()
+    apply_spend_change(old, new)
+    instance._loaded_spend = new
+
+
+@receiver(post_delete, sender=PurchaseOrder)
+def remove_daily_spend(sender, instance, **kwargs):
+    apply_spend_change(getattr(instance, '_loaded_spend', instance.spend_contribution()), None)
+
+
+@receiver(post_delete, sender=PurchaseOrderItem)
+def remove_item_total(sender, instance, origin=None, **kwargs):
+    if not deleted_directly(instance, origin):
+        return
+    purchase_order_id, total_price, is_open = getattr(instance, '_loaded_line', instance.line_state())
+    purchase_order = PurchaseOrder.objects.filter(pk=purchase_order_id).first()
+    if purchase_order is not None:
+        purchase_order.adjust_totals(-total_price, -int(is_open))
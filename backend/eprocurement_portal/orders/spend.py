@@ -0,0 +1,93 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum, Count
+from django.db.models.functions import TruncDate, TruncMonth, TruncQuarter, TruncYear
+
+from .models import PurchaseOrder, DailySpend
+
+PERIODS = {
+    'month': TruncMonth,
+    'quarter': TruncQuarter,
+    'year': TruncYear,
+}
+
+
+def apply_spend_change(old, new):
+    """Move a purchase order's contribution from ``old`` to ``new``.
+
+    Both arguments are ``(date, amount)`` tuples as returned by
+    ``PurchaseOrder.spend_contribution()``, or None when the order did not
+    count towards spend.
+    """
+    if old == new:
+        return
+
+    deltas = defaultdict(lambda: [0, Decimal('0')])
+    if old is not None:
+        deltas[old[0]][0] -= 1
+        deltas[old[0]][1] -= Decimal(old[1])
+    if new is not None:
+        deltas[new[0]][0] += 1
+        deltas[new[0]][1] += Decimal(new[1])
+
+    for day, (count, amount) in deltas.items():
+        if count or amount:
+            add_spend(day, count, amount)
+
+
+def add_spend(day, count, amount):
+    updated = DailySpend.objects.filter(date=day).update(
+        order_count=F('order_count') + count,
+        total=F('total') + amount
+    )
+    if updated:
+        return
+
+    with transaction.atomic():
+        _, created = DailySpend.objects.get_or_create(
+            date=day,
+            defaults={'order_count': count, 'total': amount}
+        )
+    if not created:
+        # Another writer created the row in the meantime
+        DailySpend.objects.filter(date=day).update(
+            order_count=F('order_count') + count,
+            total=F('total') + amount
+        )
+
+
+def spend_series(period='month', start_date=None, end_date=None):
+    """Return spend totals grouped by month, quarter or year."""
+    trunc = PERIODS[period]
+
+    queryset = DailySpend.objects.all()
+    if start_date:
+        queryset = queryset.filter(date__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(date__lte=end_date)
+
+    return list(
+        queryset.annotate(period=trunc('date')).values('period').annotate(
+            count=Sum('order_count'),
+            total=Sum('total')
+        ).filter(count__gt=0).order_by('period')
+    )
+
+
+@transaction.atomic
+def rebuild_daily_spend():
+    """Recompute the whole rollup from PurchaseOrder in one pass."""
+    rows = PurchaseOrder.objects.filter(
+        status__in=PurchaseOrder.SPEND_STATUSES
+    ).annotate(day=TruncDate('date_created')).values('day').annotate(
+        order_count=Count('id'),
+        total=Sum('grand_total')
+    ).order_by()
+
+    DailySpend.objects.all().delete()
+    DailySpend.objects.bulk_create([
+        DailySpend(date=row['day'], order_count=row['order_count'], total=row['total'])
+        for row in rows
+    ], batch_size=1000)
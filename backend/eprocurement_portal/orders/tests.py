@@ -1,3 +1,74 @@
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from vendors.models import Vendor
+from .models import PurchaseOrder, PurchaseOrderItem
+
+User = get_user_model()
+
+
+class PurchaseOrderTestMixin:
+    """Builds an officer, a vendor and a draft purchase order."""
+
+    def setUp(self):
+        self.officer = User.objects.create_user(
+            'officer', 'officer@example.com', 'password', role='procurement_officer'
+        )
+        vendor_user = User.objects.create_user(
+            'vendor', 'vendor@example.com', 'password', role='vendor'
+        )
+        self.vendor = Vendor.objects.create(
+            user=vendor_user, company_name='Vendor', company_registration_number='1',
+            tax_identification_number='1', address='Street 1', city='City', state='State',
+            postal_code='1000', country='Country'
+        )
+        self.purchase_order = PurchaseOrder.objects.create(
+            po_number='PO-1', vendor=self.vendor, created_by=self.officer,
+            expected_delivery_date=datetime.date.today(),
+            shipping_address='Street 1', billing_address='Street 1'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.officer)
+
+    def add_item(self, unit_price, quantity=1):
+        return PurchaseOrderItem.objects.create(
+            purchase_order=self.purchase_order, item_name='Item', description='Item',
+            quantity=quantity, unit_of_measure='each', unit_price=Decimal(unit_price)
+        )
+
+
+class PurchaseOrderTotalsTest(PurchaseOrderTestMixin, TestCase):
+
+    def test_grand_total_follows_charges_and_items(self):
+        self.add_item('13.00')
+        response = self.client.patch(
+            f'/api/orders/{self.purchase_order.pk}/', {'tax_amount': '10.00'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.data['grand_total']), Decimal('23.00'))
+
+        response = self.client.patch(
+            f'/api/orders/{self.purchase_order.pk}/', {'tax_amount': '20.00'}, format='json'
+        )
+        self.assertEqual(Decimal(response.data['grand_total']), Decimal('33.00'))
+
+        self.add_item('1.00')
+        self.purchase_order.refresh_from_db()
+        self.assertEqual(self.purchase_order.total_amount, Decimal('14.00'))
+        self.assertEqual(self.purchase_order.grand_total, Decimal('34.00'))
+
+    def test_full_save_keeps_concurrent_item_totals(self):
+        stale = PurchaseOrder.objects.get(pk=self.purchase_order.pk)
+        self.add_item('5.00', quantity=2)
 
-# Create your tests here.
+        stale.notes = 'Updated'
+        stale.save()
+        self.purchase_order.refresh_from_db()
+        self.assertEqual(self.purchase_order.notes, 'Updated')
+        self.assertEqual(self.purchase_order.total_amount, Decimal('10.00'))
+        self.assertEqual(self.purchase_order.grand_total, Decimal('10.00'))
+        self.assertEqual(self.purchase_order.open_line_count, 1)
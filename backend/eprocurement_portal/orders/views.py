@@ -2,38 +2,64 @@ from rest_framework import generics, status, filters
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
+from rest_framework.exceptions import ValidationError
+from eprocurement_portal.fieldsets import SparseQuerysetMixin
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db.models import Q
+from django.utils.dateparse import parse_date
+from django.db.models import Prefetch, Q
+from eprocurement_portal.pagination import StandardPagination
 from .models import PurchaseOrder, PurchaseOrderItem, Shipment, ShipmentItem
+from .receiving import receive_shipment
 from .serializers import (
-    PurchaseOrderSerializer, PurchaseOrderCreateSerializer,
-    PurchaseOrderItemSerializer, ShipmentSerializer, ShipmentItemSerializer
+    PurchaseOrderSerializer, PurchaseOrderCreateSerializer, PurchaseOrderSummarySerializer,
+    PurchaseOrderItemSerializer, ShipmentSerializer, ShipmentItemSerializer, OpenReceiptSerializer
 )
-from inventory.models import InventoryTransaction
 from requisitions.models import Requisition, RequisitionStatus
 from users.permissions import IsProcurementOfficer, IsVendor
+from users.tokens import vendor_id_for
 
-class PurchaseOrderListView(generics.ListAPIView):
-    """API endpoint for listing purchase orders."""
+class PurchaseOrderListView(SparseQuerysetMixin, generics.ListAPIView):
+    """API endpoint for listing purchase orders.
+    
+    Paginated; pass ``?summary=true`` to leave out line items and long text fields.
+    """
     serializer_class = PurchaseOrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = StandardPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['po_number', 'vendor__company_name']
     ordering_fields = ['date_created', 'expected_delivery_date', 'status', 'grand_total']
     ordering = ['-date_created']
     
+    def is_summary(self):
+        return self.request.query_params.get('summary', '').lower() in ('true', '1')
+    
+    def get_serializer_class(self):
+        if self.is_summary():
+            return PurchaseOrderSummarySerializer
+        return PurchaseOrderSerializer
+    
     def get_queryset(self):
         user = self.request.user
-        queryset = PurchaseOrder.objects.all()
+        queryset = PurchaseOrder.objects.select_related('vendor', 'created_by')
+        
+        # Fetch only what the serializer shows: a fixed number of queries per page
+        if self.is_summary():
+            queryset = queryset.only(
+                'po_number', 'vendor', 'created_by', 'date_created', 'expected_delivery_date',
+                'status', 'total_amount', 'grand_total',
+                'vendor__company_name', 'created_by__username'
+            )
+        else:
+            queryset = queryset.prefetch_related('items')
         
         # Vendors can only see their own POs
         if user.role == 'vendor':
-            try:
-                vendor = user.vendor_profile
-                queryset = queryset.filter(vendor=vendor)
-            except:
+            vendor_id = vendor_id_for(user)
+            if vendor_id is None:
                 return PurchaseOrder.objects.none()
+            queryset = queryset.filter(vendor_id=vendor_id)
         
         # Apply filters
         status = self.request.query_params.get('status')
@@ -62,7 +88,7 @@ class PurchaseOrderListView(generics.ListAPIView):
             
         return queryset
 
-class PurchaseOrderDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PurchaseOrderDetailView(SparseQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     """API endpoint for retrieving, updating, and deleting a purchase order."""
     serializer_class = PurchaseOrderSerializer
     permission_classes = [IsAuthenticated]
@@ -72,11 +98,10 @@ class PurchaseOrderDetailView(generics.RetrieveUpdateDestroyAPIView):
         
         # Vendors can only see their own POs
         if user.role == 'vendor':
-            try:
-                vendor = user.vendor_profile
-                return PurchaseOrder.objects.filter(vendor=vendor)
-            except:
+            vendor_id = vendor_id_for(user)
+            if vendor_id is None:
                 return PurchaseOrder.objects.none()
+            return PurchaseOrder.objects.filter(vendor_id=vendor_id)
         
         return PurchaseOrder.objects.all()
     
@@ -132,7 +157,7 @@ class PurchaseOrderCreateView(generics.CreateAPIView):
                 pass
 
 # Add the missing PurchaseOrderItemListView class
-class PurchaseOrderItemListView(generics.ListAPIView):
+class PurchaseOrderItemListView(SparseQuerysetMixin, generics.ListAPIView):
     """API endpoint for listing purchase order items."""
     serializer_class = PurchaseOrderItemSerializer
     permission_classes = [IsAuthenticated]
@@ -141,37 +166,72 @@ class PurchaseOrderItemListView(generics.ListAPIView):
         purchase_order_id = self.kwargs.get('purchase_order_id')
         return PurchaseOrderItem.objects.filter(purchase_order_id=purchase_order_id)
 
-class ShipmentListView(generics.ListCreateAPIView):
+def shipment_queryset():
+    """Shipments with everything ShipmentSerializer reads, in three queries per page."""
+    return Shipment.objects.select_related(
+        'purchase_order__vendor', 'received_by'
+    ).prefetch_related(
+        Prefetch('items', queryset=ShipmentItem.objects.select_related('purchase_order_item'))
+    )
+
+class ShipmentListView(SparseQuerysetMixin, generics.ListCreateAPIView):
     """API endpoint for listing and creating shipments."""
     serializer_class = ShipmentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = StandardPagination
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['expected_arrival_date', 'actual_arrival_date']
+    ordering = ['expected_arrival_date', 'id']
     
     def get_queryset(self):
         user = self.request.user
+        queryset = shipment_queryset()
         
         # Vendors can only see shipments for their POs
         if user.role == 'vendor':
-            try:
-                vendor = user.vendor_profile
-                return Shipment.objects.filter(purchase_order__vendor=vendor)
-            except:
+            vendor_id = vendor_id_for(user)
+            if vendor_id is None:
                 return Shipment.objects.none()
+            queryset = queryset.filter(purchase_order__vendor_id=vendor_id)
         
         # Filter by purchase order if provided
         purchase_order_id = self.request.query_params.get('purchase_order_id')
         if purchase_order_id:
-            return Shipment.objects.filter(purchase_order_id=purchase_order_id)
+            queryset = queryset.filter(purchase_order_id=purchase_order_id)
+        
+        is_complete = self.request.query_params.get('is_complete')
+        if is_complete is not None:
+            queryset = queryset.filter(is_complete=is_complete.lower() == 'true')
         
-        return Shipment.objects.all()
+        expected_after = self._date_param('expected_after')
+        if expected_after:
+            queryset = queryset.filter(expected_arrival_date__gte=expected_after)
+        
+        expected_before = self._date_param('expected_before')
+        if expected_before:
+            queryset = queryset.filter(expected_arrival_date__lte=expected_before)
+        
+        return queryset
+    
+    def _date_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: 'Invalid date. Use YYYY-MM-DD.'})
+        return parsed
     
     def get_permissions(self):
         if self.request.method == 'POST':
             self.permission_classes = [IsAuthenticated, IsProcurementOfficer]
         return super().get_permissions()
 
-class ShipmentDetailView(generics.RetrieveUpdateAPIView):
+class ShipmentDetailView(SparseQuerysetMixin, generics.RetrieveUpdateAPIView):
     """API endpoint for retrieving and updating a shipment."""
-    queryset = Shipment.objects.all()
     serializer_class = ShipmentSerializer
     permission_classes = [IsAuthenticated]
     
@@ -180,19 +240,52 @@ class ShipmentDetailView(generics.RetrieveUpdateAPIView):
         
         # Vendors can only see shipments for their POs
         if user.role == 'vendor':
-            try:
-                vendor = user.vendor_profile
-                return Shipment.objects.filter(purchase_order__vendor=vendor)
-            except:
+            vendor_id = vendor_id_for(user)
+            if vendor_id is None:
                 return Shipment.objects.none()
+            return shipment_queryset().filter(purchase_order__vendor_id=vendor_id)
         
-        return Shipment.objects.all()
+        return shipment_queryset()
     
     def get_permissions(self):
         if self.request.method in ['PUT', 'PATCH']:
             self.permission_classes = [IsAuthenticated, IsProcurementOfficer]
         return super().get_permissions()
 
+class OpenReceiptListView(SparseQuerysetMixin, generics.ListAPIView):
+    """API endpoint listing order lines still waiting for goods.
+    
+    Reads the fulfillment ledger through the partial index on outstanding
+    lines, so it never looks at shipments or fully received lines.
+    """
+    serializer_class = OpenReceiptSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = StandardPagination
+    
+    def get_queryset(self):
+        user = self.request.user
+        queryset = PurchaseOrderItem.objects.filter(
+            quantity_outstanding__gt=0,
+            purchase_order__status__in=['sent', 'acknowledged', 'partial']
+        ).select_related('purchase_order__vendor').order_by('purchase_order', 'id')
+        
+        # Vendors can only see lines of their own POs
+        if user.role == 'vendor':
+            vendor_id = vendor_id_for(user)
+            if vendor_id is None:
+                return PurchaseOrderItem.objects.none()
+            queryset = queryset.filter(purchase_order__vendor_id=vendor_id)
+        
+        purchase_order_id = self.request.query_params.get('purchase_order_id')
+        if purchase_order_id:
+            queryset = queryset.filter(purchase_order_id=purchase_order_id)
+        
+        vendor_id = self.request.query_params.get('vendor')
+        if vendor_id:
+            queryset = queryset.filter(purchase_order__vendor_id=vendor_id)
+        
+        return queryset
+
 class ShipmentReceiveView(APIView):
     """API endpoint for receiving shipments."""
     permission_classes = [IsAuthenticated, IsProcurementOfficer]
@@ -206,80 +299,8 @@ class ShipmentReceiveView(APIView):
                 'error': 'No items specified for receipt.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Mark current date as actual arrival
-        if not shipment.actual_arrival_date:
-            shipment.actual_arrival_date = timezone.now().date()
-        
-        # Mark the user who received the shipment
-        shipment.received_by = request.user
-        
-        # Process each received item
-        all_items_complete = True
-        for item_data in received_items:
-            shipment_item_id = item_data.get('shipment_item_id')
-            quantity_received = item_data.get('quantity_received', 0)
-            
-            if not shipment_item_id or not quantity_received:
-                continue
-                
-            try:
-                shipment_item = ShipmentItem.objects.get(id=shipment_item_id, shipment=shipment)
-                
-                # Update received quantity
-                previous_qty = shipment_item.quantity_received
-                shipment_item.quantity_received = min(quantity_received, shipment_item.quantity_shipped)
-                shipment_item.condition_notes = item_data.get('condition_notes', '')
-                shipment_item.save()
-                
-                # Calculate quantity change
-                qty_change = shipment_item.quantity_received - previous_qty
-                
-                if qty_change > 0:
-                    # Update inventory
-                    inventory_item = shipment_item.purchase_order_item.inventory_item
-                    if inventory_item:
-                        # Create transaction for inventory receipt
-                        InventoryTransaction.objects.create(
-                            item=inventory_item,
-                            transaction_type='receipt',
-                            quantity=qty_change,
-                            unit_price=shipment_item.purchase_order_item.unit_price,
-                            created_by=request.user,
-                            reference=f"PO-{shipment.purchase_order.po_number}"
-                        )
-                
-                # Check if any items are not fully received
-                if shipment_item.quantity_received < shipment_item.quantity_shipped:
-                    all_items_complete = False
-                    
-            except ShipmentItem.DoesNotExist:
-                continue
-        
-        # If all items are fully received, mark shipment as complete
-        if all_items_complete:
-            shipment.is_complete = True
-            
-            # Check if all PO shipments are complete
-            all_shipments_complete = all(
-                s.is_complete for s in Shipment.objects.filter(purchase_order=shipment.purchase_order)
-            )
-            
-            if all_shipments_complete:
-                # If all shipments are complete, mark PO as complete
-                shipment.purchase_order.status = 'complete'
-                shipment.purchase_order.save()
-                
-                # If this PO was from a requisition, mark it as completed
-                requisition = getattr(shipment.purchase_order, 'requisition', None)
-                if requisition:
-                    requisition.status = RequisitionStatus.COMPLETED
-                    requisition.save()
-            else:
-                # If partial, mark PO as partially received
-                shipment.purchase_order.status = 'partial'
-                shipment.purchase_order.save()
-        
-        shipment.save()
+        # Update all items, inventory and statuses in one transaction
+        receive_shipment(shipment.pk, received_items, request.user)
         
         return Response({
             'message': 'Shipment received successfully.'
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Requisition, RequisitionItem, RequisitionApproval
+from .models import Requisition, RequisitionItem, RequisitionApproval, ApprovalAssignment, ApprovalRule
 
 class RequisitionItemInline(admin.TabularInline):
     model = RequisitionItem
@@ -15,7 +15,7 @@ class RequisitionAdmin(admin.ModelAdmin):
     list_filter = ('status', 'priority', 'department')
     search_fields = ('title', 'requester__username', 'department')
     inlines = [RequisitionItemInline, RequisitionApprovalInline]
-    readonly_fields = ('total_estimated_cost',)
+    readonly_fields = ('total_estimated_cost', 'approval_count', 'rejection_count')
 
 @admin.register(RequisitionItem)
 class RequisitionItemAdmin(admin.ModelAdmin):
@@ -27,4 +27,16 @@ class RequisitionItemAdmin(admin.ModelAdmin):
 class RequisitionApprovalAdmin(admin.ModelAdmin):
     list_display = ('requisition', 'approver', 'approved', 'approval_date')
     list_filter = ('approved',)
-    search_fields = ('requisition__title', 'approver__username')
\ No newline at end of file
+    search_fields = ('requisition__title', 'approver__username')
+
+@admin.register(ApprovalAssignment)
+class ApprovalAssignmentAdmin(admin.ModelAdmin):
+    list_display = ('requisition', 'approver', 'created_at')
+    search_fields = ('requisition__title', 'approver__username')
+
+@admin.register(ApprovalRule)
+class ApprovalRuleAdmin(admin.ModelAdmin):
+    list_display = ('name', 'department', 'priority', 'min_amount', 'max_amount',
+                    'required_approvals', 'approver_role', 'admin_override', 'is_active')
+    list_filter = ('approver_role', 'priority', 'is_active')
+    search_fields = ('name', 'department')
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""Approval inbox: who a pending requisition is waiting for.
+
+When a requisition enters pending approval, one ``ApprovalAssignment`` is
+written per approver whose decision it needs. An approver's assignment is
+removed once they decide, and all of them once the requisition leaves
+pending approval. Inbox counters are adjusted with a single UPDATE per
+change, never recounted.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from .models import ApprovalAssignment, ApprovalInboxCounter
+from .rules import policy_for
+
+
+def approver_ids(requisition):
+    """Return the ids of the users whose decision ``requisition`` needs."""
+    return list(
+        get_user_model().objects.filter(
+            role__in=policy_for(requisition).approver_roles, is_active=True
+        ).exclude(pk=requisition.requester_id).values_list('id', flat=True)
+    )
+
+
+@transaction.atomic
+def open_assignments(requisition):
+    """Add the requisition to the inbox of every approver it is waiting for."""
+    existing = set(
+        ApprovalAssignment.objects.filter(requisition=requisition).values_list('approver_id', flat=True)
+    )
+    new_ids = [user_id for user_id in approver_ids(requisition) if user_id not in existing]
+    ApprovalAssignment.objects.bulk_create([
+        ApprovalAssignment(requisition=requisition, approver_id=user_id) for user_id in new_ids
+    ])
+    ApprovalInboxCounter.adjust(new_ids, 1)
+
+
+@transaction.atomic
+def close_assignments(requisition, approver_id=None):
+    """Remove the requisition from one approver's inbox, or from everyone's."""
+    assignments = ApprovalAssignment.objects.filter(requisition=requisition)
+    if approver_id is not None:
+        assignments = assignments.filter(approver_id=approver_id)
+    # Locking the rows keeps concurrent closes from decrementing twice
+    closed = list(assignments.select_for_update().values_list('id', 'approver_id'))
+    if not closed:
+        return
+    ApprovalAssignment.objects.filter(pk__in=[pk for pk, _ in closed]).delete()
+    ApprovalInboxCounter.adjust([user_id for _, user_id in closed], -1)
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_approval_inbox(apps, schema_editor):
+    Requisition = apps.get_model('requisitions', 'Requisition')
+    RequisitionApproval = apps.get_model('requisitions', 'RequisitionApproval')
+    ApprovalAssignment = apps.get_model('requisitions', 'ApprovalAssignment')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+
+    def decisions(approved):
+        counts = RequisitionApproval.objects.filter(
+            requisition=OuterRef('pk'), approved=approved
+        ).order_by().values('requisition').annotate(count=Count('id')).values('count')
+        return Coalesce(Subquery(counts), Value(0), output_field=IntegerField())
+
+    Requisition.objects.update(approval_count=decisions(True), rejection_count=decisions(False))
+
+    # Pending requisitions wait for every approver who has not decided yet;
+    # inbox counters are built from these rows on first read.
+    approvers = list(User.objects.filter(
+        role__in=('procurement_officer', 'admin'), is_active=True
+    ).values_list('id', flat=True))
+    decided = set(RequisitionApproval.objects.filter(
+        requisition__status='pending_approval'
+    ).values_list('requisition_id', 'approver_id'))
+    pending = Requisition.objects.filter(status='pending_approval').values_list('id', 'requester_id')
+    ApprovalAssignment.objects.bulk_create([
+        ApprovalAssignment(requisition_id=requisition_id, approver_id=approver_id)
+        for requisition_id, requester_id in pending.iterator()
+        for approver_id in approvers
+        if approver_id != requester_id and (requisition_id, approver_id) not in decided
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('requisitions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApprovalInboxCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='approval_inbox_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('pending_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Approval Inbox Counter',
+                'verbose_name_plural': 'Approval Inbox Counters',
+            },
+        ),
+        migrations.AddField(
+            model_name='requisition',
+            name='approval_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='requisition',
+            name='rejection_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ApprovalAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('approver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='approval_assignments', to=settings.AUTH_USER_MODEL)),
+                ('requisition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='requisitions.requisition')),
+            ],
+            options={
+                'verbose_name': 'Approval Assignment',
+                'verbose_name_plural': 'Approval Assignments',
+                'indexes': [models.Index(fields=['approver', '-created_at', '-id'], name='assignment_inbox_idx')],
+                'unique_together': {('requisition', 'approver')},
+            },
+        ),
+        migrations.RunPython(backfill_approval_inbox, migrations.RunPython.noop),
+    ]
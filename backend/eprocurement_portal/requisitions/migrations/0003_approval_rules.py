@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requisitions', '0002_approval_inbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApprovalRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('department', models.CharField(blank=True, help_text='Blank matches every department.', max_length=100)),
+                ('priority', models.CharField(blank=True, choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('urgent', 'Urgent')], help_text='Blank matches every priority.', max_length=10)),
+                ('min_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('max_amount', models.DecimalField(blank=True, decimal_places=2, help_text='Blank means no upper limit.', max_digits=12, null=True)),
+                ('required_approvals', models.PositiveIntegerField(default=2)),
+                ('approver_role', models.CharField(choices=[('procurement_officer', 'Procurement Officer or Admin'), ('admin', 'Admin')], default='procurement_officer', max_length=20)),
+                ('admin_override', models.BooleanField(default=True, help_text='A single admin approval is enough.')),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name': 'Approval Rule',
+                'verbose_name_plural': 'Approval Rules',
+                'ordering': ['department', 'priority', 'min_amount'],
+            },
+        ),
+    ]
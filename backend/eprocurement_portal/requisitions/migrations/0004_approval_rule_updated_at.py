@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requisitions', '0003_approval_rules'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='approvalrule',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,7 +1,11 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
-from django.db.models import F
+from django.core.exceptions import ValidationError
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 
 class RequisitionStatus(models.TextChoices):
     DRAFT = 'draft', _('Draft')
@@ -38,6 +42,9 @@ class Requisition(models.Model):
     justification = models.TextField()
     notes = models.TextField(blank=True)
     total_estimated_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
+    # Decisions recorded so far, maintained from RequisitionApproval writes
+    approval_count = models.PositiveIntegerField(default=0)
+    rejection_count = models.PositiveIntegerField(default=0)
     
     # If ordered, link to PO
     purchase_order = models.OneToOneField(
@@ -56,12 +63,135 @@ class Requisition(models.Model):
     def __str__(self):
         return f"{self.title} - {self.department}"
     
+    # Maintained with F() updates from items and approvals
+    MAINTAINED_FIELDS = ('total_estimated_cost', 'approval_count', 'rejection_count')
+    
+    def save(self, *args, **kwargs):
+        # A full save of an instance loaded earlier must not write stale
+        # maintained values back over concurrent F() updates
+        if not self._state.adding and kwargs.get('update_fields') is None and len(args) < 4:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                f.attname for f in self._meta.concrete_fields
+                if not f.primary_key and f.attname not in deferred
+                and f.name not in self.MAINTAINED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so saves can open or close assignments
+        if 'status' in field_names:
+            instance._loaded_status = instance.status
+        return instance
+    
     def calculate_total_cost(self):
-        total = 0
-        for item in self.items.all():
-            total += item.estimated_cost
-        self.total_estimated_cost = total
-        self.save()
+        # Recompute the sum of all items in the database
+        self.total_estimated_cost = self.items.aggregate(
+            total=Coalesce(Sum('estimated_cost'), Decimal('0'))
+        )['total']
+        self.save(update_fields=['total_estimated_cost'])
+    
+    def adjust_total_cost(self, delta):
+        """Apply a change in item costs with a single UPDATE."""
+        if not delta:
+            return
+        Requisition.objects.filter(pk=self.pk).update(
+            total_estimated_cost=F('total_estimated_cost') + delta
+        )
+        self.total_estimated_cost = Decimal(str(self.total_estimated_cost)) + delta
+    
+    def adjust_decisions(self, approvals=0, rejections=0):
+        """Apply a change in recorded decisions with a single UPDATE."""
+        if not approvals and not rejections:
+            return
+        Requisition.objects.filter(pk=self.pk).update(
+            approval_count=F('approval_count') + approvals,
+            rejection_count=F('rejection_count') + rejections
+        )
+        self.approval_count += approvals
+        self.rejection_count += rejections
+    
+    def add_items(self, items_data):
+        """Create items in bulk and update the total cost once.
+        
+        Items are inserted with a single query, their suggested vendors
+        with a single insert into the through table, and the requisition
+        is written once with the total computed in memory. Call it inside
+        a transaction.
+        """
+        suggested_vendors = [item_data.get('suggested_vendors', []) for item_data in items_data]
+        items = [
+            RequisitionItem(**{
+                **{key: value for key, value in item_data.items() if key != 'suggested_vendors'},
+                'requisition': self
+            })
+            for item_data in items_data
+        ]
+        for item in items:
+            item.estimated_cost = item.quantity * item.estimated_unit_price
+        RequisitionItem.objects.bulk_create(items)
+        
+        Through = RequisitionItem.suggested_vendors.through
+        Through.objects.bulk_create([
+            Through(requisitionitem_id=item.pk, vendor_id=getattr(vendor, 'pk', vendor))
+            for item, vendors in zip(items, suggested_vendors)
+            for vendor in dict.fromkeys(vendors)
+        ])
+        
+        self.total_estimated_cost = Decimal(str(self.total_estimated_cost)) + sum(
+            (item.estimated_cost for item in items), Decimal('0')
+        )
+        self.save(update_fields=['total_estimated_cost'])
+        return items
+
+class ApprovalRule(models.Model):
+    """Who must approve requisitions in an amount bracket, and how many of them.
+    
+    A rule covers totals from ``min_amount`` up to (not including)
+    ``max_amount``, optionally only for one department and/or priority.
+    The most specific matching rule wins; requisitions no rule covers
+    follow the default policy in requisitions.rules.
+    """
+    APPROVER_ROLE_CHOICES = [
+        ('procurement_officer', _('Procurement Officer or Admin')),
+        ('admin', _('Admin')),
+    ]
+    
+    name = models.CharField(max_length=255)
+    department = models.CharField(max_length=100, blank=True, help_text=_("Blank matches every department."))
+    priority = models.CharField(
+        max_length=10, choices=Requisition.PRIORITY_CHOICES, blank=True,
+        help_text=_("Blank matches every priority.")
+    )
+    min_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    max_amount = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True,
+        help_text=_("Blank means no upper limit.")
+    )
+    required_approvals = models.PositiveIntegerField(default=2)
+    approver_role = models.CharField(
+        max_length=20, choices=APPROVER_ROLE_CHOICES, default='procurement_officer'
+    )
+    admin_override = models.BooleanField(
+        default=True, help_text=_("A single admin approval is enough.")
+    )
+    is_active = models.BooleanField(default=True)
+    # Lets every process notice edits; see requisitions.rules
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = _("Approval Rule")
+        verbose_name_plural = _("Approval Rules")
+        ordering = ['department', 'priority', 'min_amount']
+    
+    def __str__(self):
+        return self.name
+    
+    def clean(self):
+        if self.max_amount is not None and self.max_amount <= self.min_amount:
+            raise ValidationError({'max_amount': _("Must be greater than the minimum amount.")})
 
 class RequisitionItem(models.Model):
     requisition = models.ForeignKey(
@@ -91,12 +221,37 @@ class RequisitionItem(models.Model):
     def __str__(self):
         return f"{self.item_name} ({self.quantity} {self.unit_of_measure})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what this item added to its requisition's total when loaded
+        if {'requisition_id', 'estimated_cost'}.issubset(field_names):
+            instance._loaded_cost = (instance.requisition_id, instance.estimated_cost)
+        return instance
+    
+    def previous_cost(self):
+        """Return ``(requisition_id, estimated_cost)`` as last saved, or None."""
+        if self.pk is None:
+            return None
+        if not hasattr(self, '_loaded_cost'):
+            self._loaded_cost = RequisitionItem.objects.filter(pk=self.pk).values_list(
+                'requisition_id', 'estimated_cost'
+            ).first()
+        return self._loaded_cost
+    
     def save(self, *args, **kwargs):
         self.estimated_cost = self.quantity * self.estimated_unit_price
+        previous = self.previous_cost()
         super().save(*args, **kwargs)
-        # Update the requisition total
-        if self.requisition:
-            self.requisition.calculate_total_cost()
+        self._loaded_cost = (self.requisition_id, self.estimated_cost)
+        
+        # Update the requisition total by the difference
+        if previous is not None and previous[0] != self.requisition_id:
+            Requisition.objects.get(pk=previous[0]).adjust_total_cost(-previous[1])
+            previous = None
+        self.requisition.adjust_total_cost(
+            self.estimated_cost - (previous[1] if previous is not None else 0)
+        )
 
 class RequisitionApproval(models.Model):
     requisition = models.ForeignKey(
@@ -118,4 +273,124 @@ class RequisitionApproval(models.Model):
     
     def __str__(self):
         status = "Approved" if self.approved else "Rejected"
-        return f"{self.requisition.title} - {self.approver.username} - {status}"
\ No newline at end of file
+        return f"{self.requisition.title} - {self.approver.username} - {status}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember which counter this decision was added to when loaded
+        if {'requisition_id', 'approved'}.issubset(field_names):
+            instance._loaded_decision = instance.decision_state()
+        return instance
+    
+    def decision_state(self):
+        """Return ``(requisition_id, approved)`` for this decision."""
+        return (self.requisition_id, self.approved)
+    
+    def previous_decision(self):
+        """Return ``decision_state()`` as last saved, or None for a new decision."""
+        if self.pk is None:
+            return None
+        if not hasattr(self, '_loaded_decision'):
+            self._loaded_decision = RequisitionApproval.objects.filter(pk=self.pk).values_list(
+                'requisition_id', 'approved'
+            ).first()
+        return self._loaded_decision
+    
+    def save(self, *args, **kwargs):
+        previous = self.previous_decision()
+        super().save(*args, **kwargs)
+        self._loaded_decision = self.decision_state()
+        if previous == self._loaded_decision:
+            return
+        
+        # Move this decision between the requisitions' counters
+        if previous is not None:
+            requisition = self.requisition if previous[0] == self.requisition_id else (
+                Requisition.objects.get(pk=previous[0])
+            )
+            requisition.adjust_decisions(-int(previous[1]), -int(not previous[1]))
+        self.requisition.adjust_decisions(int(self.approved), int(not self.approved))
+
+class ApprovalAssignment(models.Model):
+    """An approver whose decision a pending requisition is waiting for.
+    
+    Rows exist only while the decision is outstanding, so an approver's
+    inbox is an index range scan. See requisitions.approvals.
+    """
+    requisition = models.ForeignKey(
+        Requisition,
+        on_delete=models.CASCADE,
+        related_name='assignments'
+    )
+    approver = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='approval_assignments'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _("Approval Assignment")
+        verbose_name_plural = _("Approval Assignments")
+        unique_together = ['requisition', 'approver']
+        indexes = [
+            models.Index(fields=['approver', '-created_at', '-id'], name='assignment_inbox_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.requisition_id} awaiting {self.approver_id}"
+
+class ApprovalInboxCounter(models.Model):
+    """Denormalized count of a user's outstanding approval assignments.
+    
+    Kept in step with assignment writes so the inbox badge is a single
+    primary-key lookup.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='approval_inbox_counter'
+    )
+    pending_count = models.IntegerField(default=0)
+    
+    class Meta:
+        verbose_name = _("Approval Inbox Counter")
+        verbose_name_plural = _("Approval Inbox Counters")
+    
+    def __str__(self):
+        return f"{self.user_id}: {self.pending_count} pending"
+    
+    @classmethod
+    def pending_for(cls, user_id):
+        count = cls.objects.filter(user_id=user_id).values_list('pending_count', flat=True).first()
+        if count is None:
+            # No counter yet; build it from the assignments themselves
+            count = cls.rebuild(user_id)
+        return count
+    
+    @classmethod
+    def adjust(cls, user_ids, delta):
+        """Atomically add ``delta`` to each user's pending count."""
+        if not delta or not user_ids:
+            return
+        # A missing counter is built from the assignments on first read,
+        # so there is nothing to adjust until then.
+        cls.objects.filter(user_id__in=user_ids).update(
+            pending_count=F('pending_count') + delta
+        )
+    
+    @classmethod
+    def rebuild(cls, user_id):
+        # Create the row first so that assignment writes racing with the
+        # rebuild adjust it, then lock it and recount in one transaction.
+        cls.objects.get_or_create(user_id=user_id)
+        count = ApprovalAssignment.objects.filter(approver_id=OuterRef('user_id')).order_by().values(
+            'approver_id'
+        ).annotate(count=Count('id')).values('count')
+        with transaction.atomic():
+            cls.objects.select_for_update().get(user_id=user_id)
+            counter = cls.objects.filter(user_id=user_id)
+            counter.update(pending_count=Coalesce(Subquery(count), 0))
+            return counter.values_list('pending_count', flat=True).get()
\ No newline at end of file
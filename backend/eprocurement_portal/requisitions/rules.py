@@ -0,0 +1,143 @@
+"""Approval rules compiled into an in-memory decision table.
+
+``ApprovalRule`` rows are compiled, per ``(department, priority)`` pair
+(blank meaning "any"), into sorted amount boundaries with the winning
+policy for each segment between them. Finding the policy for a
+requisition is then at most four dict lookups and binary searches; the
+only query is a periodic check for changed rules.
+
+The table is compiled on first use and again whenever rules change.
+Saves in this process reset it right away. Other processes notice changes
+from the rules' latest ``updated_at`` and row count in the database,
+checked at most every ``APPROVAL_RULES_CHECK_INTERVAL`` seconds.
+"""
+import bisect
+import threading
+import time
+from decimal import Decimal
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+ANY = ''
+
+
+class ApprovalPolicy(NamedTuple):
+    """What a requisition needs to be approved."""
+    required_approvals: int
+    approver_roles: tuple
+    admin_override: bool
+    rule_id: Optional[int] = None
+
+    def is_approved(self, approval_count, approver_role):
+        """Whether a requisition with ``approval_count`` approvals, the latest
+        by a user with ``approver_role``, is now approved."""
+        if self.admin_override and approver_role == 'admin':
+            return True
+        return approval_count >= self.required_approvals
+
+
+# Requisitions no rule covers: an admin approves instantly, otherwise two approvals
+DEFAULT_POLICY = ApprovalPolicy(2, ('procurement_officer', 'admin'), True)
+
+ROLES = {
+    'procurement_officer': ('procurement_officer', 'admin'),
+    'admin': ('admin',),
+}
+
+
+class RuleTable:
+    """Approval policies by (department, priority), segmented by amount."""
+
+    def __init__(self, rules):
+        groups = {}
+        for rule in rules:
+            groups.setdefault((rule.department, rule.priority), []).append(rule)
+        self.segments = {key: self._segment(group) for key, group in groups.items()}
+
+    @staticmethod
+    def _segment(rules):
+        """Split the amount axis at every rule boundary and pick each piece's rule.
+
+        Where rules overlap, the one created first wins.
+        """
+        rules = sorted(rules, key=lambda rule: rule.pk)
+        points = sorted({rule.min_amount for rule in rules} | {
+            rule.max_amount for rule in rules if rule.max_amount is not None
+        })
+        bounds, policies = [], []
+        for start in points:
+            rule = next((
+                rule for rule in rules
+                if rule.min_amount <= start and (rule.max_amount is None or start < rule.max_amount)
+            ), None)
+            policy = rule and ApprovalPolicy(
+                rule.required_approvals, ROLES[rule.approver_role], rule.admin_override, rule.pk
+            )
+            # Adjacent pieces with the same rule are one segment
+            if policies and policies[-1] == policy:
+                continue
+            bounds.append(start)
+            policies.append(policy)
+        return bounds, policies
+
+    def lookup(self, department, priority, amount):
+        amount = Decimal(str(amount))
+        for key in ((department, priority), (department, ANY), (ANY, priority), (ANY, ANY)):
+            segments = self.segments.get(key)
+            if segments is None:
+                continue
+            bounds, policies = segments
+            index = bisect.bisect_right(bounds, amount) - 1
+            if index >= 0 and policies[index] is not None:
+                return policies[index]
+        return DEFAULT_POLICY
+
+
+class _CompiledRules:
+    """The process's compiled table and the rules version it was built from."""
+
+    def __init__(self):
+        self.table = None
+        self.version = None
+        self.checked_at = 0
+        self.lock = threading.Lock()
+
+    def get(self):
+        now = time.monotonic()
+        interval = getattr(settings, 'APPROVAL_RULES_CHECK_INTERVAL', 5)
+        if self.table is not None and now - self.checked_at < interval:
+            return self.table
+
+        with self.lock:
+            from .models import ApprovalRule
+            version = ApprovalRule.objects.aggregate(Max('updated_at'), Count('id'))
+            if self.table is None or version != self.version:
+                self.table = RuleTable(ApprovalRule.objects.filter(is_active=True))
+                self.version = version
+            self.checked_at = now
+            return self.table
+
+    def reset(self):
+        with self.lock:
+            self.table = None
+
+
+_compiled = _CompiledRules()
+
+
+def get_rule_table():
+    return _compiled.get()
+
+
+def rules_changed():
+    """Recompile on next use in this process; others notice on their next check."""
+    _compiled.reset()
+
+
+def policy_for(requisition):
+    """Return the ApprovalPolicy that applies to ``requisition``."""
+    return get_rule_table().lookup(
+        requisition.department, requisition.priority, requisition.total_estimated_cost
+    )
@@ -1,9 +1,11 @@
+from django.db import transaction
 from rest_framework import serializers
-from .models import Requisition, RequisitionItem, RequisitionApproval
+from eprocurement_portal.fieldsets import SparseFieldsMixin
+from .models import Requisition, RequisitionItem, RequisitionApproval, ApprovalAssignment
 from vendors.serializers import VendorSerializer
 from inventory.serializers import InventoryItemSerializer
 
-class RequisitionItemSerializer(serializers.ModelSerializer):
+class RequisitionItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     suggested_vendors_details = VendorSerializer(source='suggested_vendors', many=True, read_only=True)
     inventory_item_details = InventoryItemSerializer(source='inventory_item', read_only=True)
     
@@ -14,8 +16,9 @@ class RequisitionItemSerializer(serializers.ModelSerializer):
                   'inventory_item', 'inventory_item_details', 'suggested_vendors',
                   'suggested_vendors_details')
         read_only_fields = ('requisition', 'estimated_cost')
+        expandable_fields = ('inventory_item_details', 'suggested_vendors_details')
 
-class RequisitionApprovalSerializer(serializers.ModelSerializer):
+class RequisitionApprovalSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     approver_name = serializers.CharField(source='approver.username', read_only=True)
     
     class Meta:
@@ -24,7 +27,24 @@ class RequisitionApprovalSerializer(serializers.ModelSerializer):
                   'approval_date', 'comments')
         read_only_fields = ('approval_date',)
 
-class RequisitionSerializer(serializers.ModelSerializer):
+class ApprovalAssignmentSerializer(serializers.ModelSerializer):
+    title = serializers.CharField(source='requisition.title', read_only=True)
+    department = serializers.CharField(source='requisition.department', read_only=True)
+    priority = serializers.CharField(source='requisition.priority', read_only=True)
+    date_needed = serializers.DateField(source='requisition.date_needed', read_only=True)
+    total_estimated_cost = serializers.DecimalField(
+        source='requisition.total_estimated_cost', max_digits=12, decimal_places=2, read_only=True
+    )
+    requester_name = serializers.CharField(source='requisition.requester.username', read_only=True)
+    approval_count = serializers.IntegerField(source='requisition.approval_count', read_only=True)
+    
+    class Meta:
+        model = ApprovalAssignment
+        fields = ('id', 'requisition', 'title', 'department', 'priority', 'date_needed',
+                  'total_estimated_cost', 'requester_name', 'approval_count', 'created_at')
+        read_only_fields = fields
+
+class RequisitionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     requester_name = serializers.CharField(source='requester.username', read_only=True)
     items = RequisitionItemSerializer(many=True, read_only=True)
     approvals = RequisitionApprovalSerializer(many=True, read_only=True)
@@ -34,10 +54,13 @@ class RequisitionSerializer(serializers.ModelSerializer):
         model = Requisition
         fields = ('id', 'title', 'department', 'requester', 'requester_name',
                   'status', 'date_created', 'date_needed', 'priority', 'justification',
-                  'notes', 'total_estimated_cost', 'purchase_order', 'purchase_order_number',
-                  'items', 'approvals')
+                  'notes', 'total_estimated_cost', 'approval_count', 'rejection_count',
+                  'purchase_order', 'purchase_order_number', 'items', 'approvals')
         read_only_fields = ('requester', 'date_created', 'total_estimated_cost', 
-                          'purchase_order', 'purchase_order_number')
+                          'approval_count', 'rejection_count', 'purchase_order',
+                          'purchase_order_number')
+        expandable_fields = ('items', 'approvals')
+        field_sources = {'purchase_order_number': ('purchase_order__po_number',)}
     
     def get_purchase_order_number(self, obj):
         if obj.purchase_order:
@@ -55,25 +78,11 @@ class RequisitionCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         items_data = validated_data.pop('items')
         
-        # Create the requisition
-        requisition = Requisition.objects.create(**validated_data)
-        
-        # Create the items
-        for item_data in items_data:
-            # Handle many-to-many fields
-            suggested_vendors = item_data.pop('suggested_vendors', [])
-            
-            # Create item
-            requisition_item = RequisitionItem.objects.create(
-                requisition=requisition,
-                **item_data
-            )
+        with transaction.atomic():
+            # Create the requisition
+            requisition = Requisition.objects.create(**validated_data)
             
-            # Add suggested vendors
-            if suggested_vendors:
-                requisition_item.suggested_vendors.set(suggested_vendors)
-        
-        # Calculate total cost
-        requisition.calculate_total_cost()
+            # Create the items, their suggested vendors and the total in one pass
+            requisition.add_items(items_data)
         
         return requisition
\ No newline at end of file
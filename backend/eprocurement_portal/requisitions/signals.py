@@ -0,0 +1,72 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from eprocurement_portal.deletion import deleted_directly
+from .approvals import close_assignments, open_assignments
+from .models import ApprovalRule, Requisition, RequisitionApproval, RequisitionItem, RequisitionStatus
+from .rules import rules_changed
+
+
+@receiver(post_delete, sender=RequisitionItem)
+def remove_item_cost(sender, instance, origin=None, **kwargs):
+    if not deleted_directly(instance, origin):
+        return
+    requisition_id, estimated_cost = getattr(
+        instance, '_loaded_cost', (instance.requisition_id, instance.estimated_cost)
+    )
+    requisition = Requisition.objects.filter(pk=requisition_id).first()
+    if requisition is not None:
+        requisition.adjust_total_cost(-estimated_cost)
+
+
+@receiver(pre_save, sender=Requisition)
+def load_previous_status(sender, instance, update_fields=None, **kwargs):
+    # Instances not loaded through from_db have no recorded status yet
+    if instance.pk is None or hasattr(instance, '_loaded_status'):
+        return
+    if update_fields is not None and 'status' not in update_fields:
+        return
+    instance._loaded_status = sender.objects.filter(pk=instance.pk).values_list(
+        'status', flat=True
+    ).first()
+
+
+@receiver(post_save, sender=Requisition)
+def update_assignments(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and 'status' not in update_fields:
+        return
+    previous = None if created else getattr(instance, '_loaded_status', None)
+    pending = RequisitionStatus.PENDING_APPROVAL
+    if instance.status == pending and previous != pending:
+        open_assignments(instance)
+    elif previous == pending and instance.status != pending:
+        close_assignments(instance)
+    instance._loaded_status = instance.status
+
+
+@receiver(pre_delete, sender=Requisition)
+def remove_assignments(sender, instance, **kwargs):
+    # The cascade deletes assignments without touching the inbox counters
+    close_assignments(instance)
+
+
+@receiver(post_save, sender=RequisitionApproval)
+def close_decided_assignment(sender, instance, **kwargs):
+    close_assignments(instance.requisition_id, instance.approver_id)
+
+
+@receiver(post_delete, sender=RequisitionApproval)
+def remove_decision(sender, instance, origin=None, **kwargs):
+    if not deleted_directly(instance, origin):
+        return
+    requisition_id, approved = getattr(instance, '_loaded_decision', instance.decision_state())
+    requisition = Requisition.objects.filter(pk=requisition_id).first()
+    if requisition is not None:
+        requisition.adjust_decisions(-int(approved), -int(not approved))
+
+
+@receiver(post_save, sender=ApprovalRule)
+@receiver(post_delete, sender=ApprovalRule)
+def recompile_rules(sender, **kwargs):
+    transaction.on_commit(rules_changed)
@@ -1,12 +1,15 @@
 from django.urls import path
 from .views import (
     RequisitionListView, RequisitionDetailView, RequisitionCreateView,
-    RequisitionApprovalView, RequisitionItemView, RequisitionItemDetailView
+    RequisitionApprovalView, RequisitionItemView, RequisitionItemDetailView,
+    ApprovalInboxView, ApprovalInboxCountView
 )
 
 urlpatterns = [
     path('', RequisitionListView.as_view(), name='requisition-list'),
     path('create/', RequisitionCreateView.as_view(), name='requisition-create'),
+    path('inbox/', ApprovalInboxView.as_view(), name='approval-inbox'),
+    path('inbox/count/', ApprovalInboxCountView.as_view(), name='approval-inbox-count'),
     path('<int:pk>/', RequisitionDetailView.as_view(), name='requisition-detail'),
     path('<int:pk>/approve/', RequisitionApprovalView.as_view(), name='requisition-approve'),
     path('<int:requisition_id>/items/', RequisitionItemView.as_view(), name='requisition-items'),
@@ -2,28 +2,58 @@ from rest_framework import generics, status, filters
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
+from eprocurement_portal.fieldsets import SparseQuerysetMixin
+from django.db import transaction
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Sum
+from django.db.models import Prefetch, Q, Sum
 from django.utils import timezone
-from .models import Requisition, RequisitionItem, RequisitionApproval, RequisitionStatus
+from eprocurement_portal.pagination import KeysetPagination, StandardPagination
+from .models import (
+    Requisition, RequisitionItem, RequisitionApproval, RequisitionStatus,
+    ApprovalAssignment, ApprovalInboxCounter
+)
 from .serializers import (
     RequisitionSerializer, RequisitionCreateSerializer, 
-    RequisitionItemSerializer, RequisitionApprovalSerializer
+    RequisitionItemSerializer, RequisitionApprovalSerializer, ApprovalAssignmentSerializer
 )
 from users.permissions import IsProcurementOfficer, IsAdminUser
+from vendors.models import Vendor
+from dashboard.notifications import notify_role
+from .rules import policy_for
+
+def requisition_item_queryset():
+    """Requisition items with everything RequisitionItemSerializer reads."""
+    return RequisitionItem.objects.select_related('inventory_item__category').prefetch_related(
+        Prefetch(
+            'suggested_vendors',
+            queryset=Vendor.objects.select_related('user', 'approved_by').prefetch_related('categories')
+        )
+    )
 
-class RequisitionListView(generics.ListAPIView):
+def requisition_queryset():
+    """Requisitions with everything RequisitionSerializer reads.
+    
+    A page costs the same six queries however many requisitions, items
+    and suggested vendors it holds.
+    """
+    return Requisition.objects.select_related('requester', 'purchase_order').prefetch_related(
+        Prefetch('items', queryset=requisition_item_queryset().order_by('id')),
+        Prefetch('approvals', queryset=RequisitionApproval.objects.select_related('approver')),
+    )
+
+class RequisitionListView(SparseQuerysetMixin, generics.ListAPIView):
     """API endpoint for listing requisitions."""
     serializer_class = RequisitionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = StandardPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'department', 'requester__username']
     ordering_fields = ['date_created', 'priority', 'department', 'status']
-    ordering = ['-date_created']
+    ordering = ['-date_created', '-id']
     
     def get_queryset(self):
         user = self.request.user
-        queryset = Requisition.objects.all()
+        queryset = requisition_queryset()
         
         # Filter based on user role
         if user.role == 'procurement_officer' or user.role == 'admin':
@@ -56,9 +86,8 @@ class RequisitionListView(generics.ListAPIView):
             
         return queryset
 
-class RequisitionDetailView(generics.RetrieveUpdateDestroyAPIView):
+class RequisitionDetailView(SparseQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     """API endpoint for retrieving, updating, and deleting a requisition."""
-    queryset = Requisition.objects.all()
     serializer_class = RequisitionSerializer
     permission_classes = [IsAuthenticated]
     
@@ -74,8 +103,8 @@ class RequisitionDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.role in ['admin', 'procurement_officer']:
-            return Requisition.objects.all()
-        return Requisition.objects.filter(
+            return requisition_queryset()
+        return requisition_queryset().filter(
             Q(requester=user) | Q(approvals__approver=user)
         ).distinct()
     
@@ -133,13 +162,27 @@ class RequisitionCreateView(generics.CreateAPIView):
             requisition = serializer.instance
             requisition.status = RequisitionStatus.PENDING_APPROVAL
             requisition.save()
+            
+            # Let every approver know there is work waiting
+            notify_role(
+                ['procurement_officer', 'admin'],
+                'approval',
+                'Approval required',
+                f'Requisition "{requisition.title}" is awaiting approval.',
+                link=f'/requisitions/{requisition.id}'
+            )
+        
+        # Respond with the requisition loaded through the prefetch plan
+        serializer.instance = requisition_queryset().get(pk=serializer.instance.pk)
 
 class RequisitionApprovalView(APIView):
     """API endpoint for approving or rejecting requisitions."""
     permission_classes = [IsAuthenticated, IsProcurementOfficer]
     
+    @transaction.atomic
     def post(self, request, pk):
-        requisition = get_object_or_404(Requisition, pk=pk)
+        # Locked so concurrent decisions see each other's counts
+        requisition = get_object_or_404(Requisition.objects.select_for_update(), pk=pk)
         approved = request.data.get('approved', False)
         comments = request.data.get('comments', '')
         
@@ -149,6 +192,13 @@ class RequisitionApprovalView(APIView):
                 'error': f'Cannot approve/reject requisition in {requisition.status} state.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
+        # The approval rules decide whose decision counts
+        policy = policy_for(requisition)
+        if request.user.role not in policy.approver_roles:
+            return Response({
+                'error': 'Your approval is not required for this requisition.'
+            }, status=status.HTTP_403_FORBIDDEN)
+        
         # Check if this user has already approved/rejected
         approval, created = RequisitionApproval.objects.get_or_create(
             requisition=requisition,
@@ -160,34 +210,22 @@ class RequisitionApprovalView(APIView):
         )
         
         if not created:
+            # Saving through this requisition keeps its counters current in memory
+            approval.requisition = requisition
             approval.approved = approved
             approval.comments = comments
             approval.save()
         
         # Check if approved
         if approved:
-            # If approved by an admin, mark as approved
-            if request.user.role == 'admin':
-                requisition.status = RequisitionStatus.APPROVED
-                requisition.save()
-                return Response({
-                    'message': 'Requisition has been approved.'
-                }, status=status.HTTP_200_OK)
-            
-            # Logic for multi-level approval - for now just count approvals
-            # In a real system, you'd check against approval workflow rules
-            approval_count = RequisitionApproval.objects.filter(
-                requisition=requisition, approved=True
-            ).count()
-            
-            # If we have at least 2 approvals, mark as approved
-            # (This is just an example - adjust based on your requirements)
-            if approval_count >= 2:
+            if policy.is_approved(requisition.approval_count, request.user.role):
                 requisition.status = RequisitionStatus.APPROVED
-                requisition.save()
-                return Response({
-                    'message': 'Requisition has been approved with multiple approvers.'
-                }, status=status.HTTP_200_OK)
+                requisition.save(update_fields=['status'])
+                if requisition.approval_count > 1:
+                    message = 'Requisition has been approved with multiple approvers.'
+                else:
+                    message = 'Requisition has been approved.'
+                return Response({'message': message}, status=status.HTTP_200_OK)
             
             return Response({
                 'message': 'Approval recorded. Awaiting additional approvals.'
@@ -195,19 +233,37 @@ class RequisitionApprovalView(APIView):
         else:
             # If rejected, update status immediately
             requisition.status = RequisitionStatus.REJECTED
-            requisition.save()
+            requisition.save(update_fields=['status'])
             return Response({
                 'message': 'Requisition has been rejected.'
             }, status=status.HTTP_200_OK)
 
-class RequisitionItemView(generics.ListCreateAPIView):
+class ApprovalInboxView(generics.ListAPIView):
+    """API endpoint listing the requisitions waiting for the user's decision, newest first."""
+    serializer_class = ApprovalAssignmentSerializer
+    permission_classes = [IsAuthenticated, IsProcurementOfficer]
+    pagination_class = KeysetPagination
+    
+    def get_queryset(self):
+        return ApprovalAssignment.objects.filter(
+            approver=self.request.user
+        ).select_related('requisition__requester')
+
+class ApprovalInboxCountView(APIView):
+    """API endpoint for the number of requisitions waiting for the user's decision."""
+    permission_classes = [IsAuthenticated, IsProcurementOfficer]
+    
+    def get(self, request):
+        return Response({'pending': ApprovalInboxCounter.pending_for(request.user.id)})
+
+class RequisitionItemView(SparseQuerysetMixin, generics.ListCreateAPIView):
     """API endpoint for listing and adding items to a requisition."""
     serializer_class = RequisitionItemSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
         requisition_id = self.kwargs.get('requisition_id')
-        return RequisitionItem.objects.filter(requisition_id=requisition_id)
+        return requisition_item_queryset().filter(requisition_id=requisition_id)
     
     def perform_create(self, serializer):
         requisition_id = self.kwargs.get('requisition_id')
@@ -223,7 +279,7 @@ class RequisitionItemView(generics.ListCreateAPIView):
         
         serializer.save(requisition=requisition)
 
-class RequisitionItemDetailView(generics.RetrieveUpdateDestroyAPIView):
+class RequisitionItemDetailView(SparseQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     """API endpoint for managing a specific requisition item."""
     serializer_class = RequisitionItemSerializer
     permission_classes = [IsAuthenticated]
@@ -232,7 +288,7 @@ class RequisitionItemDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         requisition_id = self.kwargs.get('requisition_id')
         item_id = self.kwargs.get('item_id')
-        return RequisitionItem.objects.filter(requisition_id=requisition_id, id=item_id)
+        return requisition_item_queryset().filter(requisition_id=requisition_id, id=item_id)
     
     def perform_update(self, serializer):
         requisition = serializer.instance.requisition
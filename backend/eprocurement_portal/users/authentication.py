@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import CLAIM_FIELDS, VENDOR_ID_CLAIM, VERSION_CLAIM
+
+
+def user_from_claims(token, is_active):
+    """Build the token's user from its claims.
+
+    The instance is a normal user whose other fields are deferred, so
+    anything beyond the claims is loaded on first access, and it can be
+    assigned to foreign keys as usual.
+    """
+    User = get_user_model()
+    loaded = {
+        User._meta.pk.attname: token[api_settings.USER_ID_CLAIM],
+        User.USERNAME_FIELD: token['username'],
+        'is_active': is_active,
+        VERSION_CLAIM: token[VERSION_CLAIM],
+        **{field: token[field] for field in CLAIM_FIELDS},
+    }
+    fields = [f.attname for f in User._meta.concrete_fields if f.attname in loaded]
+    user = User.from_db(DEFAULT_DB_ALIAS, fields, [loaded[name] for name in fields])
+    user.vendor_id = token[VENDOR_ID_CLAIM]
+    return user
+
+
+def load_deferred_fields(user):
+    """Load whatever fields a token user left deferred, in one query."""
+    deferred = user.get_deferred_fields()
+    if deferred:
+        user.refresh_from_db(fields=deferred)
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT authentication that takes the user's role and vendor from the token.
+
+    Each request reads only the user's ``claims_version`` and ``is_active``
+    by primary key, instead of the whole user and their vendor profile.
+    Tokens whose version no longer matches are rejected, so that clients
+    refresh them. Tokens without claims (issued before they were added)
+    fall back to loading the user.
+    """
+    claims = (api_settings.USER_ID_CLAIM, 'username', VENDOR_ID_CLAIM, VERSION_CLAIM) + CLAIM_FIELDS
+
+    def get_user(self, validated_token):
+        if not all(claim in validated_token for claim in self.claims):
+            return super().get_user(validated_token)
+
+        state = self.user_model.objects.filter(
+            **{api_settings.USER_ID_FIELD: validated_token[api_settings.USER_ID_CLAIM]}
+        ).values_list(VERSION_CLAIM, 'is_active').first()
+        if state is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        claims_version, is_active = state
+        if api_settings.CHECK_USER_IS_ACTIVE and not is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if claims_version != validated_token[VERSION_CLAIM]:
+            raise InvalidToken(_('Token claims are out of date, refresh the token.'))
+        return user_from_claims(validated_token, is_active)
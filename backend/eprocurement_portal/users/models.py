@@ -22,10 +22,35 @@ class CustomUser(AbstractUser):
     department = models.CharField(max_length=100, blank=True)
     profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
     phone_number = models.CharField(max_length=20, blank=True)
+    # Bumped whenever the claims in the user's access tokens go stale
+    claims_version = models.PositiveIntegerField(default=0)
     
     class Meta:
         verbose_name = _("User")
         verbose_name_plural = _("Users")
     
     def __str__(self):
-        return self.username
\ No newline at end of file
+        return self.username
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the claims this user's tokens were issued with
+        if {'role', 'department', 'is_active'}.issubset(field_names):
+            instance._loaded_claims = instance.claims_state()
+        return instance
+    
+    def save(self, *args, **kwargs):
+        # claims_version only moves through F() updates, so a full save of
+        # an instance loaded earlier must not write an old version back
+        if not self._state.adding and kwargs.get('update_fields') is None and len(args) < 4:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                f.attname for f in self._meta.concrete_fields
+                if not f.primary_key and f.attname not in deferred and f.name != 'claims_version'
+            ]
+        super().save(*args, **kwargs)
+    
+    def claims_state(self):
+        """Return the fields that access tokens depend on."""
+        return (self.role, self.department, self.is_active)
\ No newline at end of file
@@ -1,6 +1,11 @@
 from rest_framework import serializers
+from eprocurement_portal.fieldsets import SparseFieldsMixin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .tokens import PortalRefreshToken, add_claims
 
 User = get_user_model()
 
@@ -43,7 +48,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         
         return user
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'username', 'email', 'first_name', 'last_name', 
@@ -59,4 +64,34 @@ class ChangePasswordSerializer(serializers.Serializer):
     def validate(self, attrs):
         if attrs['new_password'] != attrs['new_password2']:
             raise serializers.ValidationError({"new_password": "Password fields didn't match."})
-        return attrs
\ No newline at end of file
+        return attrs
+
+class PortalTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Issues tokens carrying the user's authorization claims."""
+    token_class = PortalRefreshToken
+
+class PortalTokenRefreshSerializer(TokenRefreshSerializer):
+    """Issues access tokens with the user's current claims.
+    
+    The claims are read from the database rather than copied from the
+    refresh token, so a refresh picks up role and vendor changes.
+    """
+    token_class = PortalRefreshToken
+    
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages['no_active_account'], 'no_active_account'
+            )
+        
+        data = {'access': str(add_claims(refresh.access_token, user))}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(add_claims(refresh, user))
+        return data
@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+User = get_user_model()
+
+TOKEN_FIELDS = {'role', 'department', 'is_active'}
+
+
+def _saves_claims(update_fields):
+    return update_fields is None or bool(TOKEN_FIELDS & set(update_fields))
+
+
+def _bump_claims_version(*user_ids):
+    # Part of the same transaction as the change, so tokens go stale exactly when it commits
+    User.objects.filter(pk__in={user_id for user_id in user_ids if user_id is not None}).update(
+        claims_version=F('claims_version') + 1
+    )
+
+
+@receiver(pre_save, sender=User)
+def load_previous_claims(sender, instance, update_fields=None, **kwargs):
+    # Instances not loaded through from_db (or loaded without the claim
+    # fields) have no recorded claims yet, so read them once.
+    if instance.pk is None or hasattr(instance, '_loaded_claims') or not _saves_claims(update_fields):
+        return
+    previous = sender.objects.filter(pk=instance.pk).only(*TOKEN_FIELDS).first()
+    instance._loaded_claims = previous.claims_state() if previous else None
+
+
+@receiver(post_save, sender=User)
+def expire_stale_tokens(sender, instance, created, update_fields=None, **kwargs):
+    if not _saves_claims(update_fields):
+        return
+    current = instance.claims_state()
+    if not created and getattr(instance, '_loaded_claims', None) != current:
+        _bump_claims_version(instance.pk)
+        instance.refresh_from_db(fields=['claims_version'])
+    instance._loaded_claims = current
+
+
+@receiver(post_save, sender='vendors.Vendor')
+def expire_vendor_tokens(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_loaded_user_id', None)
+    if created or previous != instance.user_id:
+        _bump_claims_version(previous, instance.user_id)
+    instance._loaded_user_id = instance.user_id
+
+
+@receiver(post_delete, sender='vendors.Vendor')
+def expire_deleted_vendor_tokens(sender, instance, **kwargs):
+    _bump_claims_version(instance.user_id)
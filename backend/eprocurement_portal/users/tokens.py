@@ -0,0 +1,55 @@
+"""JWTs carrying the claims the API authorizes on.
+
+Access tokens embed the user's ``role``, ``department`` and ``vendor_id``
+so that ``ClaimsJWTAuthentication`` can authorize a request without
+loading the user or their vendor profile. They also carry the user's
+``claims_version``, which is bumped in the database whenever any of these
+change; tokens with an older version are rejected and clients refresh,
+which reads the current claims.
+"""
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+CLAIM_FIELDS = ('role', 'department')
+VENDOR_ID_CLAIM = 'vendor_id'
+VERSION_CLAIM = 'claims_version'
+
+
+def vendor_id_for(user):
+    """Return the id of the user's vendor profile, or None.
+
+    Token users carry it as a claim; other users are looked up once and
+    the result is kept on the instance.
+    """
+    if not hasattr(user, VENDOR_ID_CLAIM):
+        from vendors.models import Vendor
+        user.vendor_id = Vendor.objects.filter(user_id=user.pk).values_list(
+            'id', flat=True
+        ).first()
+    return user.vendor_id
+
+
+def add_claims(token, user):
+    """Write the user's authorization claims into ``token``."""
+    for field in CLAIM_FIELDS:
+        token[field] = getattr(user, field)
+    token[VENDOR_ID_CLAIM] = vendor_id_for(user)
+    token[VERSION_CLAIM] = user.claims_version
+    token['username'] = user.get_username()
+    return token
+
+
+class PortalAccessToken(AccessToken):
+    """Access token carrying the user's authorization claims."""
+
+    @classmethod
+    def for_user(cls, user):
+        return add_claims(super().for_user(user), user)
+
+
+class PortalRefreshToken(RefreshToken):
+    """Refresh token whose access tokens carry the user's authorization claims."""
+    access_token_class = PortalAccessToken
+
+    @classmethod
+    def for_user(cls, user):
+        return add_claims(super().for_user(user), user)
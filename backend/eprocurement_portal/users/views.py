@@ -1,8 +1,10 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from eprocurement_portal.fieldsets import SparseQuerysetMixin
 from django.contrib.auth import get_user_model
 from .serializers import UserRegistrationSerializer, UserSerializer, ChangePasswordSerializer
+from .authentication import load_deferred_fields
 from .permissions import IsAdminUser, IsSameUser
 from django.shortcuts import get_object_or_404
 
@@ -19,16 +21,16 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     
     def get_object(self):
-        return self.request.user
+        return load_deferred_fields(self.request.user)
 
 class CurrentUserView(generics.RetrieveAPIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = UserSerializer
     
     def get_object(self):
-        return self.request.user
+        return load_deferred_fields(self.request.user)
 
-class UserListView(generics.ListAPIView):
+class UserListView(SparseQuerysetMixin, generics.ListAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (IsAuthenticated, IsAdminUser)
@@ -38,7 +40,7 @@ class ChangePasswordView(generics.UpdateAPIView):
     serializer_class = ChangePasswordSerializer
     
     def get_object(self):
-        return self.request.user
+        return load_deferred_fields(self.request.user)
     
     def update(self, request, *args, **kwargs):
         user = self.get_object()
@@ -56,6 +56,14 @@ class Vendor(models.Model):
     
     def __str__(self):
         return self.company_name
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The user's tokens carry this vendor's id
+        if 'user_id' in field_names:
+            instance._loaded_user_id = instance.user_id
+        return instance
 
 class VendorDocument(models.Model):
     vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name='documents')
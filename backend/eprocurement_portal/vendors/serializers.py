@@ -1,10 +1,11 @@
 from rest_framework import serializers
+from eprocurement_portal.fieldsets import SparseFieldsMixin
 from django.contrib.auth import get_user_model
 from .models import Vendor, VendorCategory, VendorDocument
 
 User = get_user_model()
 
-class VendorCategorySerializer(serializers.ModelSerializer):
+class VendorCategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = VendorCategory
         fields = ('id', 'name', 'description')
@@ -42,7 +43,7 @@ class VendorRegistrationSerializer(serializers.ModelSerializer):
         
         return vendor
 
-class VendorSerializer(serializers.ModelSerializer):
+class VendorSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user_details = serializers.SerializerMethodField()
     categories = VendorCategorySerializer(many=True, read_only=True)
     approved_by_name = serializers.CharField(source='approved_by.username', read_only=True)
@@ -54,6 +55,11 @@ class VendorSerializer(serializers.ModelSerializer):
                  'categories', 'status', 'registration_date', 'approved_date',
                  'approved_by', 'approved_by_name', 'user_details')
         read_only_fields = ('registration_date', 'approved_date', 'approved_by', 'status')
+        expandable_fields = ('categories', 'user_details')
+        field_sources = {
+            'user_details': ('user__username', 'user__email', 'user__first_name',
+                             'user__last_name', 'user__phone_number'),
+        }
     
     def get_user_details(self, obj):
         return {
@@ -65,7 +71,7 @@ class VendorSerializer(serializers.ModelSerializer):
             'phone_number': obj.user.phone_number
         }
 
-class VendorDocumentSerializer(serializers.ModelSerializer):
+class VendorDocumentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     vendor_name = serializers.CharField(source='vendor.company_name', read_only=True)
     
     class Meta:
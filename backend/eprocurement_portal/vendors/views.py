@@ -2,6 +2,7 @@ from rest_framework import generics, status, filters
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
+from eprocurement_portal.fieldsets import SparseQuerysetMixin
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.db.models import Q
@@ -11,6 +12,7 @@ from .serializers import (
     VendorCategorySerializer, VendorDocumentSerializer
 )
 from users.permissions import IsAdminUser, IsProcurementOfficer, IsVendor
+from users.tokens import vendor_id_for
 
 class VendorRegistrationView(generics.CreateAPIView):
     """API endpoint for registering a new vendor."""
@@ -33,7 +35,7 @@ class VendorProfileView(generics.RetrieveUpdateAPIView):
                 return get_object_or_404(Vendor, id=vendor_id)
             return get_object_or_404(Vendor, user=self.request.user)
 
-class VendorListView(generics.ListAPIView):
+class VendorListView(SparseQuerysetMixin, generics.ListAPIView):
     """API endpoint for listing all vendors."""
     serializer_class = VendorSerializer
     permission_classes = [IsAuthenticated, IsProcurementOfficer]
@@ -87,7 +89,7 @@ class VendorApprovalView(generics.UpdateAPIView):
                 'error': 'Invalid action. Use "approve" or "reject".'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-class VendorCategoryListView(generics.ListCreateAPIView):
+class VendorCategoryListView(SparseQuerysetMixin, generics.ListCreateAPIView):
     """API endpoint for listing and creating vendor categories."""
     queryset = VendorCategory.objects.all()
     serializer_class = VendorCategorySerializer
@@ -100,7 +102,7 @@ class VendorCategoryListView(generics.ListCreateAPIView):
             self.permission_classes = [IsAuthenticated, IsProcurementOfficer]
         return super().get_permissions()
 
-class VendorDocumentView(generics.ListCreateAPIView):
+class VendorDocumentView(SparseQuerysetMixin, generics.ListCreateAPIView):
     """API endpoint for managing vendor documents."""
     serializer_class = VendorDocumentSerializer
     permission_classes = [IsAuthenticated]
@@ -113,8 +115,7 @@ class VendorDocumentView(generics.ListCreateAPIView):
             return VendorDocument.objects.filter(vendor_id=vendor_id)
         else:
             # Vendors can only view their own documents
-            vendor = get_object_or_404(Vendor, user=self.request.user)
-            if vendor.id == int(vendor_id):
+            if vendor_id_for(self.request.user) == int(vendor_id):
                 return VendorDocument.objects.filter(vendor_id=vendor_id)
             return VendorDocument.objects.none()
     
@@ -128,7 +129,7 @@ class VendorDocumentView(generics.ListCreateAPIView):
         else:
             raise PermissionError("You don't have permission to upload documents for this vendor.")
 
-class VendorDocumentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class VendorDocumentDetailView(SparseQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     """API endpoint for viewing, updating, and deleting a specific vendor document."""
     serializer_class = VendorDocumentSerializer
     permission_classes = [IsAuthenticated]
@@ -142,7 +143,6 @@ class VendorDocumentDetailView(generics.RetrieveUpdateDestroyAPIView):
             return VendorDocument.objects.filter(vendor_id=vendor_id, id=document_id)
         else:
             # Vendors can only access their own documents
-            vendor = get_object_or_404(Vendor, user=self.request.user)
-            if vendor.id == int(vendor_id):
+            if vendor_id_for(self.request.user) == int(vendor_id):
                 return VendorDocument.objects.filter(vendor_id=vendor_id, id=document_id)
             return VendorDocument.objects.none()
\ No newline at end of file